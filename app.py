@@ -40,57 +40,212 @@ TEST MODE:
 - Set TEST_MODE = False in test_config.py for live trading
 """
 
-from flask import Flask, render_template, request, redirect, url_for
-from bitunix_model import BitunixClient
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+
+import orjson
+from flask import Flask, Response, render_template, request, redirect, url_for
+from bitunix_model import BitunixClient, extract_last_price
 from datetime import datetime
 
 app = Flask(__name__)
 client = BitunixClient()
 
+# Shared pool for fanning out independent (IO-bound) API calls
+executor = ThreadPoolExecutor(max_workers=4)
+
+# TP/SL price multipliers by position side
+# Longs: TP 2% above, SL 5% below (10% emergency); shorts mirrored
+TP_MULT = {'BUY': 1.02, 'SELL': 0.98}
+SL_MULT = {'BUY': 0.95, 'SELL': 1.05}
+SL_EMERGENCY_MULT = {'BUY': 0.90, 'SELL': 1.10}
+
+# Short-lived caches: positions/account data changes slowly relative to a
+# single button click, token metadata is effectively static
+TRADES_CACHE_TTL = 1.5  # seconds
+TOKEN_INFO_CACHE_TTL = 60.0  # seconds
+
+# Live price feed: one background poller refreshes all tickers into memory,
+# the trade table and /stream subscribers read from that buffer
+PRICE_FEED_INTERVAL = 2.0  # seconds between upstream refreshes
+PRICE_FEED_MAX_AGE = 5.0  # buffered prices older than this are considered stale
+PRICE_STREAM_KEEPALIVE = 15.0  # seconds between SSE keepalive comments
+# Each open /stream holds a worker thread for as long as the page stays open;
+# cap them per process so normal requests always have threads left (Procfile: --threads 8)
+MAX_PRICE_STREAMS = 4
+
+
+def ttl_cache(ttl, maxsize=4):
+    """Memoize a function's results for `ttl` seconds (keyed by positional args)"""
+    def decorator(func):
+        cache = {}
+        lock = threading.Lock()
+
+        @wraps(func)
+        def wrapper(*args):
+            now = time.monotonic()
+            with lock:
+                hit = cache.get(args)
+                if hit is not None and now - hit[0] < ttl:
+                    return hit[1]
+            result = func(*args)
+            with lock:
+                if len(cache) >= maxsize:
+                    cache.clear()
+                cache[args] = (now, result)
+            return result
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+
+@ttl_cache(TOKEN_INFO_CACHE_TTL, maxsize=16)
+def get_token_info(symbol):
+    return client.get_token_info(symbol)
+
+
+def compute_tp_sl(side, price):
+    """Return (tp_price, sl_price) for a position side at the given price"""
+    side = 'BUY' if side == 'BUY' else 'SELL'
+    tp_price = round(price * TP_MULT[side], 4)
+    sl_price = round(price * SL_MULT[side], 4)
+    # Ensure SL is actually on the losing side of the current price
+    sl_on_wrong_side = sl_price >= price if side == 'BUY' else sl_price <= price
+    if sl_on_wrong_side:
+        sl_price = round(price * SL_EMERGENCY_MULT[side], 4)
+        app.logger.debug("Emergency SL adjustment: %s", sl_price)
+    return tp_price, sl_price
+
+
+@lru_cache(maxsize=4096)
+def format_number(num, decimals=8):
+    """Format a number to fixed precision without trailing zeros"""
+    formatted = '%.*f' % (decimals, num)
+    return formatted.rstrip('0').rstrip('.') if decimals else formatted
+
+
+def fetch_ticker_prices():
+    """Map every futures symbol to its last price using a single get_all_tickers call"""
+    tickers = client.get_all_tickers()
+    if tickers.get('code') != 0:
+        app.logger.warning("get_all_tickers failed: %s", tickers)
+        return {}
+    return {
+        t.get('symbol'): float(t.get('lastPrice') or t.get('price') or 0)
+        for t in tickers.get('data') or []
+    }
+
+
+get_ticker_prices = ttl_cache(TRADES_CACHE_TTL)(fetch_ticker_prices)
+
+
+price_feed = {'prices': {}, 'updated': 0.0, 'version': 0, 'thread': None, 'subscribers': 0}
+price_feed_cond = threading.Condition()
+
+
+def poll_price_feed():
+    """Background loop: refresh the in-memory price buffer and wake stream subscribers"""
+    while True:
+        with price_feed_cond:
+            if not price_feed['subscribers']:
+                # Last subscriber left - stop polling until the next /stream request
+                price_feed['thread'] = None
+                return
+        try:
+            prices = fetch_ticker_prices()
+        except Exception as e:
+            app.logger.warning("Price feed refresh failed: %s", e)
+            prices = {}
+        if prices:
+            with price_feed_cond:
+                if prices != price_feed['prices']:
+                    price_feed['prices'] = prices
+                    price_feed['version'] += 1
+                    price_feed_cond.notify_all()
+                price_feed['updated'] = time.monotonic()
+        time.sleep(PRICE_FEED_INTERVAL)
+
+
+def subscribe_price_feed():
+    """Register a /stream subscriber and start the poller if needed; False when at MAX_PRICE_STREAMS"""
+    with price_feed_cond:
+        if price_feed['subscribers'] >= MAX_PRICE_STREAMS:
+            return False
+        price_feed['subscribers'] += 1
+        if price_feed['thread'] is None:
+            thread = threading.Thread(target=poll_price_feed, name='price-feed', daemon=True)
+            price_feed['thread'] = thread
+            thread.start()
+    return True
+
+
+def unsubscribe_price_feed():
+    """Release a /stream slot; the poller exits on its next pass once none are left"""
+    with price_feed_cond:
+        price_feed['subscribers'] -= 1
+
+
+def get_feed_prices():
+    """Buffered prices from the live feed, or None if the feed is not running or stale"""
+    with price_feed_cond:
+        if time.monotonic() - price_feed['updated'] < PRICE_FEED_MAX_AGE:
+            return price_feed['prices']
+    return None
+
+
+@ttl_cache(TRADES_CACHE_TTL)
 def get_trade_table_data():
+    # Positions and account info are independent - fetch them concurrently
+    all_pos_future = executor.submit(client.get_all_positions)
+    account_future = executor.submit(client.get_account)
+    
     # Try get_all_positions first (might have more detailed data)
     res = None
     try:
-        all_pos_res = client.get_all_positions()
+        all_pos_res = all_pos_future.result()
         if all_pos_res.get('code') == 0 and all_pos_res.get('data'):
             res = all_pos_res
-            print("Using get_all_positions data")
+            app.logger.debug("Using get_all_positions data")
         else:
-            print(f"get_all_positions failed: {all_pos_res}")
+            app.logger.debug("get_all_positions failed: %s", all_pos_res)
     except Exception as e:
-        print(f"get_all_positions error: {e}")
+        app.logger.warning("get_all_positions error: %s", e)
     
     # Fall back to get_pending_positions
     if not res or res.get('code') != 0:
         res = client.get_pending_positions()
-        print("Using get_pending_positions data")
+        app.logger.debug("Using get_pending_positions data")
     
     trades = []
     
-    # Format numbers without trailing zeros
-    def format_number(num, decimals=8):
-        formatted = f"{num:.{decimals}f}"
-        return formatted.rstrip('0').rstrip('.') if '.' in formatted else formatted
-    
     # Try to get account information for margin rate calculation
     account_info = None
     try:
-        account_res = client.get_account()
+        account_res = account_future.result()
         if account_res.get('code') == 0:
             account_info = account_res.get('data', {})
-            print(f"Account info: {account_info}")
+            app.logger.debug("Account info: %s", account_info)
         else:
-            print(f"Account info failed: {account_res}")
+            app.logger.debug("Account info failed: %s", account_res)
     except Exception as e:
-        print(f"Could not get account info: {e}")
+        app.logger.warning("Could not get account info: %s", e)
     
     if res.get('code') == 0:
         positions_data = res.get('data', [])
-        print(f"Found {len(positions_data)} positions")
+        app.logger.debug("Found %d positions", len(positions_data))
         
         # If no positions, add test data based on user's BTC example
         if not positions_data:
-            print("No positions found - adding test BTC data")
+            app.logger.debug("No positions found - adding test BTC data")
             positions_data = [{
                 'symbol': 'BTCUSDT',
                 'qty': '0.00010000',
@@ -104,9 +259,15 @@ def get_trade_table_data():
                 'unrealizedPNL': '-0.82153000'
             }]
         
-        for i, p in enumerate(positions_data):
-            print(f"Position {i}: {p}")
+        if app.logger.isEnabledFor(logging.DEBUG):
+            for i, p in enumerate(positions_data):
+                app.logger.debug("Position %d: %s", i, p)
             
+        # Positions without a markPrice are priced from one bulk ticker lookup
+        price_by_symbol = {}
+        if any(not p.get('markPrice') for p in positions_data):
+            price_by_symbol = get_feed_prices() or get_ticker_prices()
+        
         for p in positions_data:
             symbol = p.get('symbol', '')
             position_size = float(p.get('qty', 0))
@@ -120,32 +281,14 @@ def get_trade_table_data():
             margin_rate = p.get('marginRate', '0.00%')
             unrealized_pnl = float(p.get('unrealizedPNL', 0))
             
-            print(f"Position {symbol}: markPrice={p.get('markPrice')}, margin={p.get('margin')}, marginRate={p.get('marginRate')}, unrealizedPNL={p.get('unrealizedPNL')}")
+            app.logger.debug("Position %s: markPrice=%s, margin=%s, marginRate=%s, unrealizedPNL=%s",
+                             symbol, p.get('markPrice'), p.get('margin'), p.get('marginRate'), p.get('unrealizedPNL'))
             
             # If calculated fields not available, calculate them
             if mark_price == open_price and not p.get('markPrice'):
-                # Try different symbol formats for ticker price
-                symbol_formats = [symbol, symbol.replace('USDT', ''), f"{symbol.replace('USDT', '')}USDT"]
-                for sym_fmt in symbol_formats:
-                    try:
-                        price_info = client.get_ticker_price(sym_fmt)
-                        if price_info.get('code') == 0 and price_info.get('data'):
-                            # Handle the case where data is a list of tickers
-                            if isinstance(price_info['data'], list):
-                                for ticker in price_info['data']:
-                                    if ticker.get('symbol') == sym_fmt:
-                                        mark_price = float(ticker.get('lastPrice', open_price))
-                                        print(f"Got price for {sym_fmt}: {mark_price}")
-                                        break
-                            else:
-                                # Handle single ticker response
-                                mark_price = float(price_info['data'].get('lastPrice', open_price))
-                                print(f"Got price for {sym_fmt}: {mark_price}")
-                            break
-                        else:
-                            print(f"Failed to get price for {sym_fmt}: {price_info}")
-                    except Exception as e:
-                        print(f"Error getting price for {sym_fmt}: {e}")
+                mark_price = (price_by_symbol.get(symbol)
+                              or price_by_symbol.get(symbol.replace('USDT', ''))
+                              or open_price)
             
             if margin == 0:
                 margin = (position_size * open_price) / leverage
@@ -154,7 +297,7 @@ def get_trade_table_data():
                 total_margin = float(account_info.get('totalMargin', 0))
                 if total_margin > 0:
                     margin_rate = f"{(margin / total_margin * 100):.2f}%"
-                    print(f"Account margin: {total_margin}, Position margin: {margin}, Rate: {margin_rate}")
+                    app.logger.debug("Account margin: %s, Position margin: %s, Rate: %s", total_margin, margin, margin_rate)
             
             if unrealized_pnl == 0:
                 # Calculate Unrealized PnL for futures
@@ -197,172 +340,77 @@ def collect_trades():
     trades = get_trade_table_data()
     return render_template('index.html', trades=trades, message=None)
 
-@app.route('/set_tp', methods=['POST'])
-def set_tp():
-    position_id = request.form['position_id']
-    symbol = request.form['symbol']
-    
-    # Try multiple methods to get current price
-    current_price = None
-    
+def resolve_current_price(trade, symbol):
+    """Get the current price for a position, trying several sources in turn"""
     # Method 1: Use position mark price (most reliable)
-    trades = get_trade_table_data()
-    for trade in trades:
-        if str(trade['position_id']) == str(position_id):
-            current_price = float(trade['mark_price'].replace(',', ''))
-            print(f"Using position mark price: {current_price}")
-            break
+    if trade:
+        current_price = float(trade['mark_price'].replace(',', ''))
+        if current_price:
+            app.logger.debug("Using position mark price: %s", current_price)
+            return current_price
     
     # Method 2: get_ticker_price (fallback)
-    if current_price is None or current_price == 0:
-        price_info = client.get_ticker_price(symbol)
-        if price_info.get('code') == 0 and price_info.get('data'):
-            # Handle the case where data is a list of tickers
-            if isinstance(price_info['data'], list):
-                for ticker in price_info['data']:
-                    if ticker.get('symbol') == symbol:
-                        current_price = float(ticker.get('lastPrice', 0))
-                        print(f"Got price from get_ticker_price: {current_price}")
-                        break
-            else:
-                # Handle single ticker response
-                current_price = float(price_info['data'].get('lastPrice', 0))
-                print(f"Got price from get_ticker_price: {current_price}")
+    price_info = client.get_ticker_price(symbol)
+    if price_info.get('code') == 0:
+        current_price = extract_last_price(price_info, symbol)
+        if current_price:
+            app.logger.debug("Got price from get_ticker_price: %s", current_price)
+            return current_price
     
     # Method 3: get_all_tickers (fallback)
-    if current_price is None or current_price == 0:
-        all_tickers = client.get_all_tickers()
-        if all_tickers.get('code') == 0 and all_tickers.get('data'):
-            for ticker in all_tickers['data']:
-                if ticker.get('symbol') == symbol:
-                    price = float(ticker.get('price', 0))
-                    if price > 0:
-                        current_price = price
-                        print(f"Got price from get_all_tickers: {current_price}")
-                        break
-    
-    if current_price is None or current_price == 0:
-        message = "Failed to get current price from all sources."
-    else:
-        # For BUY positions: TP above current price, SL below current price
-        # For SELL positions: TP below current price, SL above current price
-        position_side = None
-        for trade in trades:
-            if str(trade['position_id']) == str(position_id):
-                position_side = trade['side']
-                break
-        
-        if position_side == 'BUY':
-            tp_price = round(current_price * 1.02, 4)  # 2% above for longs
-            sl_price = round(current_price * 0.95, 4)  # 5% below for longs (more conservative)
-        else:  # SELL position
-            tp_price = round(current_price * 0.98, 4)  # 2% below for shorts
-            sl_price = round(current_price * 1.05, 4)  # 5% above for shorts (more conservative)
-        
-        print(f"Position side: {position_side}, Current price: {current_price}, TP: {tp_price}, SL: {sl_price}")
-        print(f"Debug - Current price type: {type(current_price)}, value: {repr(current_price)}")
-        print(f"Debug - TP calculation: {current_price} * 1.02 = {current_price * 1.02}")
-        print(f"Debug - SL calculation: {current_price} * 0.95 = {current_price * 0.95}")
-        
-        # Ensure SL is actually below current price for BUY positions
-        if position_side == 'BUY' and sl_price >= current_price:
-            sl_price = round(current_price * 0.90, 4)  # Emergency: 10% below
-            print(f"Emergency SL adjustment: {sl_price}")
-        elif position_side == 'SELL' and sl_price <= current_price:
-            sl_price = round(current_price * 1.10, 4)  # Emergency: 10% above
-            print(f"Emergency SL adjustment: {sl_price}")
-        
-        # Demonstrates: set_take_profit_full_by_id() - Set TP for specific position
-        res = client.set_take_profit_full_by_id(symbol, position_id, str(tp_price))
-        if res.get('code') == 0:
-            message = f"TP set to {tp_price}"
-        else:
-            message = f"Failed to set TP: {res.get('msg')}"
+    all_tickers = client.get_all_tickers()
+    if all_tickers.get('code') == 0 and all_tickers.get('data'):
+        for ticker in all_tickers['data']:
+            if ticker.get('symbol') == symbol:
+                price = float(ticker.get('price', 0))
+                if price > 0:
+                    app.logger.debug("Got price from get_all_tickers: %s", price)
+                    return price
     
-    trades = get_trade_table_data()
-    return render_template('index.html', trades=trades, message=message)
+    return None
 
-@app.route('/set_sl', methods=['POST'])
-def set_sl():
-    position_id = request.form['position_id']
+def set_position_tpsl(kind):
+    """Shared body of set_tp/set_sl: resolve the price, then place a TP or SL order"""
+    position_id = str(request.form['position_id'])
     symbol = request.form['symbol']
     
-    # Try multiple methods to get current price
-    current_price = None
-    
-    # Method 1: Use position mark price (most reliable)
     trades = get_trade_table_data()
-    for trade in trades:
-        if str(trade['position_id']) == str(position_id):
-            current_price = float(trade['mark_price'].replace(',', ''))
-            print(f"Using position mark price: {current_price}")
-            break
+    trade = {str(t['position_id']): t for t in trades}.get(position_id)
+    current_price = resolve_current_price(trade, symbol)
     
-    # Method 2: get_ticker_price (fallback)
-    if current_price is None or current_price == 0:
-        price_info = client.get_ticker_price(symbol)
-        if price_info.get('code') == 0 and price_info.get('data'):
-            # Handle the case where data is a list of tickers
-            if isinstance(price_info['data'], list):
-                for ticker in price_info['data']:
-                    if ticker.get('symbol') == symbol:
-                        current_price = float(ticker.get('lastPrice', 0))
-                        print(f"Got price from get_ticker_price: {current_price}")
-                        break
-            else:
-                # Handle single ticker response
-                current_price = float(price_info['data'].get('lastPrice', 0))
-                print(f"Got price from get_ticker_price: {current_price}")
-    
-    # Method 3: get_all_tickers (fallback)
-    if current_price is None or current_price == 0:
-        all_tickers = client.get_all_tickers()
-        if all_tickers.get('code') == 0 and all_tickers.get('data'):
-            for ticker in all_tickers['data']:
-                if ticker.get('symbol') == symbol:
-                    price = float(ticker.get('price', 0))
-                    if price > 0:
-                        current_price = price
-                        print(f"Got price from get_all_tickers: {current_price}")
-                        break
-    
-    if current_price is None or current_price == 0:
+    if not current_price:
         message = "Failed to get current price from all sources."
     else:
         # For BUY positions: TP above current price, SL below current price
         # For SELL positions: TP below current price, SL above current price
-        position_side = None
-        for trade in trades:
-            if str(trade['position_id']) == str(position_id):
-                position_side = trade['side']
-                break
+        position_side = trade['side'] if trade else None
+        tp_price, sl_price = compute_tp_sl(position_side, current_price)
+        app.logger.debug("Position side: %s, Current price: %s, TP: %s, SL: %s", position_side, current_price, tp_price, sl_price)
         
-        if position_side == 'BUY':
-            sl_price = round(current_price * 0.95, 4)  # 5% below for longs
-        else:  # SELL position
-            sl_price = round(current_price * 1.05, 4)  # 5% above for shorts
-        
-        print(f"Position side: {position_side}, Current price: {current_price}, SL: {sl_price}")
-        print(f"Debug - SL calculation: {current_price} * 0.95 = {current_price * 0.95}")
-        
-        # Ensure SL is actually below current price for BUY positions
-        if position_side == 'BUY' and sl_price >= current_price:
-            sl_price = round(current_price * 0.90, 4)  # Emergency: 10% below
-            print(f"Emergency SL adjustment: {sl_price}")
-        elif position_side == 'SELL' and sl_price <= current_price:
-            sl_price = round(current_price * 1.10, 4)  # Emergency: 10% above
-            print(f"Emergency SL adjustment: {sl_price}")
-        
-        # Demonstrates: set_stop_loss_full_by_id() - Set SL for specific position
-        res = client.set_stop_loss_full_by_id(symbol, position_id, str(sl_price))
+        if kind == 'TP':
+            # Demonstrates: set_take_profit_full_by_id() - Set TP for specific position
+            price = tp_price
+            res = client.set_take_profit_full_by_id(symbol, position_id, str(tp_price))
+        else:
+            # Demonstrates: set_stop_loss_full_by_id() - Set SL for specific position
+            price = sl_price
+            res = client.set_stop_loss_full_by_id(symbol, position_id, str(sl_price))
         if res.get('code') == 0:
-            message = f"SL set to {sl_price}"
+            message = f"{kind} set to {price}"
         else:
-            message = f"Failed to set SL: {res.get('msg')}"
+            message = f"Failed to set {kind}: {res.get('msg')}"
     
-    trades = get_trade_table_data()
+    # TP/SL orders don't change the position table - reuse the data loaded above
     return render_template('index.html', trades=trades, message=message)
 
+@app.route('/set_tp', methods=['POST'])
+def set_tp():
+    return set_position_tpsl('TP')
+
+@app.route('/set_sl', methods=['POST'])
+def set_sl():
+    return set_position_tpsl('SL')
+
 @app.route('/close_position', methods=['POST'])
 def close_position():
     position_id = request.form['position_id']
@@ -370,6 +418,8 @@ def close_position():
     # Demonstrates: close_position_full_by_id() - Close 100% of specific position
     res = client.close_position_full_by_id(symbol, position_id)
     message = "Position closed."
+    # Positions changed - don't serve the cached table
+    get_trade_table_data.cache_clear()
     trades = get_trade_table_data()
     return render_template('index.html', trades=trades, message=message)
 
@@ -378,8 +428,7 @@ def new_trade():
     symbol = request.form['symbol']
     
     # Get trade details (similar to test script)
-    client = BitunixClient()
-    token_info = client.get_token_info(symbol)
+    token_info = get_token_info(symbol)
     trading_symbol = token_info['trading_symbol']
     min_quantity = token_info['min_quantity']
     current_price = token_info['current_price']
@@ -420,5 +469,40 @@ def new_trade():
     trades = get_trade_table_data()
     return render_template('index.html', trades=trades, trade_details=trade_details, message=None)
 
+@app.route('/stream')
+def stream():
+    """Server-sent events: push mark price changes for the requested symbols"""
+    symbols = {sym for sym in request.args.get('symbols', '').split(',') if sym}
+    if not subscribe_price_feed():
+        # EventSource gives up on a non-200 reply, so the page just keeps its static prices
+        return Response("Too many price streams", status=503, mimetype='text/plain')
+    
+    def events():
+        version = None
+        sent = {}
+        while True:
+            with price_feed_cond:
+                price_feed_cond.wait_for(lambda: price_feed['version'] != version,
+                                         timeout=PRICE_STREAM_KEEPALIVE)
+                version = price_feed['version']
+                prices = price_feed['prices']
+            changes = {
+                sym: price for sym, price in prices.items()
+                if (not symbols or sym in symbols) and sent.get(sym) != price
+            }
+            if changes:
+                sent.update(changes)
+                yield b"data: " + orjson.dumps(changes) + b"\n\n"
+            else:
+                # Comment line keeps the connection alive and detects closed clients
+                yield b": keepalive\n\n"
+    
+    response = Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+    # Runs when the server closes the response (client gone), whether or not events() started
+    response.call_on_close(unsubscribe_price_feed)
+    return response
+
 if __name__ == '__main__':
-    app.run(debug=True)
+    # Debug mode (and its reloader) only on request: FLASK_DEBUG=1 python app.py
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='127.0.0.1', port=5000,
+            use_reloader=False, threaded=True)
@@ -25,26 +25,65 @@ Authentication:
 - Stage 2: signature = SHA256(digest + secret_key)
 """
 
+import logging
+import os
+import random
 import requests
+import threading
 import time
+import functools
 import hashlib
-import json
-import uuid
-from typing import Dict, Optional, Any, List
+import binascii
+import secrets
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Any, List, Union
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from creds import BITUNIX_CONFIG
 from test_config import (
-    TEST_MODE, SUPPORTED_TOKENS, MAX_POSITION_SIZE_USD, MAX_TOTAL_EXPOSURE_USD,
-    MAX_DAILY_TRADES, MAX_LEVERAGE, MIN_QUANTITIES, SENTIMENT_BUY_THRESHOLD,
-    SENTIMENT_SELL_THRESHOLD, MIN_CONFIDENCE_THRESHOLD, TAKE_PROFIT_PERCENTAGE,
-    STOP_LOSS_PERCENTAGE, TestTradeManager, TokenConfigManager
+    TEST_MODE, SUPPORTED_TOKENS, MAX_POSITION_SIZE_USD, MAX_LEVERAGE,
+    TestTradeManager, TokenConfigManager
 )
 
+logger = logging.getLogger(__name__)
+
+# Mock prices used in test mode (paper trading)
+MOCK_PRICES = {
+    'XRPUSDT': 0.75, 'ADAUSDT': 0.45, 'SUIUSDT': 1.85,
+    'UNIUSDT': 8.50, 'LINKUSDT': 15.20, 'SOLUSDT': 125.50
+}
+
+# Kline interval lengths in milliseconds (mock kline generation)
+KLINE_INTERVAL_MS = {
+    "1m": 60000, "5m": 300000, "15m": 900000,
+    "30m": 1800000, "1h": 3600000, "4h": 14400000, "1d": 86400000
+}
+
+# Connection pooling for the shared HTTP session (keep-alive TLS reuse)
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 16
+# Transport-level retries for connection errors and gateway 5xx. Only idempotent
+# methods (GET/HEAD/...) are replayed - a POSTed order is never resent.
+HTTP_MAX_RETRIES = 2
+HTTP_RETRY_BACKOFF = 0.2
+HTTP_RETRY_STATUSES = (429, 502, 503, 504)
+# (connect, read) timeout for every API call, so a stalled request cannot hang a caller
+HTTP_TIMEOUT = (3.05, 10)
+# Probed minimum quantities are kept on disk - probing places real orders (seconds)
+MIN_QTY_CACHE_FILE = os.path.join(".cache", "min_qty.json")
+MIN_QTY_CACHE_TTL = 24 * 3600
+# How long a ticker price is reused by get_current_price(s) (seconds)
+PRICE_CACHE_TTL = 0.5
+# How long a pending-positions snapshot is reused for TP/SL qty lookups (seconds)
+PENDING_POSITIONS_TTL = 2.0
+
 
 # ==================== AUTHENTICATION HELPERS ====================
 
 def get_nonce() -> str:
     """Generate a random string as nonce"""
-    return str(uuid.uuid4()).replace('-', '')
+    return secrets.token_hex(16)
 
 
 def get_timestamp() -> str:
@@ -60,34 +99,124 @@ def sort_params(params: Dict[str, Any]) -> str:
     return "&".join([f"{k}={v}" for k, v in sorted_params])
 
 
-def get_auth_headers(api_key: str, secret_key: str, query_string: str, body: str = "") -> Dict[str, str]:
+def get_signature(nonce: str, timestamp: str, api_key: str, secret_key: str,
+                  query_string: str, body: str = "") -> str:
     """
-    Generate authentication headers using dual SHA256 signature
+    Compute the dual SHA256 request signature
     
     Steps:
     1. digest = SHA256(nonce + timestamp + api_key + query_string + body)
     2. signature = SHA256(digest + secret_key)
     """
-    nonce = get_nonce()
-    timestamp = get_timestamp()
-    
     # Stage 1: Create digest
     digest_input = nonce + timestamp + api_key + query_string + body
     digest = hashlib.sha256(digest_input.encode('utf-8')).hexdigest()
     
     # Stage 2: Create signature
     sign_input = digest + secret_key
-    signature = hashlib.sha256(sign_input.encode('utf-8')).hexdigest()
+    return hashlib.sha256(sign_input.encode('utf-8')).hexdigest()
+
+
+def canonical_json(body_dict: Dict[str, Any]) -> bytes:
+    """Serialize a request body exactly as it is signed and sent (compact, sorted keys)"""
+    return orjson.dumps(body_dict, option=orjson.OPT_SORT_KEYS)
+
+
+@functools.lru_cache(maxsize=64)
+def market_order_body(symbol: str, side: str, quantity: str) -> bytes:
+    """Canonical body for a MARKET OPEN order, cached for repeated symbol/side/qty"""
+    return canonical_json({
+        "symbol": symbol,
+        "side": side,
+        "orderType": "MARKET",
+        "qty": quantity,
+        "tradeSide": "OPEN"
+    })
+
+
+# close_all_position body for the default margin coin
+CLOSE_ALL_USDT_BODY = canonical_json({"marginCoin": "USDT"})
+
+
+def get_auth_headers(api_key: str, secret_key: str, query_string: str, body: str = "") -> Dict[str, str]:
+    """Generate authentication headers using dual SHA256 signature"""
+    nonce = get_nonce()
+    timestamp = get_timestamp()
     
     return {
         'api-key': api_key,
         'nonce': nonce,
         'timestamp': timestamp,
-        'sign': signature,
+        'sign': get_signature(nonce, timestamp, api_key, secret_key, query_string, body),
         'Content-Type': 'application/json'
     }
 
 
+# ==================== RESPONSE HELPERS ====================
+
+def extract_last_price(price_info: Dict[str, Any], symbol: str, default: float = 0.0) -> float:
+    """Get lastPrice for symbol from a tickers response (list of tickers or single ticker)"""
+    data = price_info.get('data') or []
+    if isinstance(data, list):
+        ticker = next((t for t in data if t.get('symbol') == symbol), None)
+    else:
+        ticker = data
+    return float(ticker.get('lastPrice', default)) if ticker else default
+
+
+# ==================== DISK CACHE ====================
+
+_disk_cache_lock = threading.Lock()
+
+
+def _read_disk_cache(path: str) -> Dict[str, Any]:
+    """Whole JSON cache file as a dict; empty when missing, unreadable or not a JSON object"""
+    try:
+        with open(path, 'rb') as f:
+            cache = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def load_disk_cache_entry(path: str, key: str, ttl: float) -> Optional[Dict[str, Any]]:
+    """Entry stored under key in a JSON cache file if written within ttl seconds, else None"""
+    entry = _read_disk_cache(path).get(key)
+    if not isinstance(entry, dict):
+        return None
+    ts = entry.get('ts')
+    if isinstance(ts, (int, float)) and time.time() - ts < ttl:
+        return entry
+    return None
+
+
+def store_disk_cache_entry(path: str, key: str, entry: Dict[str, Any]) -> None:
+    """Record entry under key in a JSON cache file, stamped with the current time (atomic replace)"""
+    with _disk_cache_lock:
+        cache = _read_disk_cache(path)
+        cache[key] = dict(entry, ts=time.time())
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(cache))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not write cache %s: %s", path, e)
+
+
+def get_cached_min_qty(trading_symbol: str) -> Optional[float]:
+    """Minimum quantity cached on disk within MIN_QTY_CACHE_TTL, else None"""
+    entry = load_disk_cache_entry(MIN_QTY_CACHE_FILE, trading_symbol, MIN_QTY_CACHE_TTL)
+    qty = entry and entry.get('qty')
+    return float(qty) if isinstance(qty, (int, float)) and qty > 0 else None
+
+
+def store_cached_min_qty(trading_symbol: str, qty: float) -> None:
+    """Record a probed minimum quantity in the on-disk cache"""
+    store_disk_cache_entry(MIN_QTY_CACHE_FILE, trading_symbol, {'qty': qty})
+
+
 # ==================== BITUNIX CLIENT ====================
 
 class BitunixClient:
@@ -101,21 +230,79 @@ class BitunixClient:
     - Risk management for small accounts
     """
     
-    def __init__(self, test_mode: bool = None):
+    # Fixed attribute set: no per-instance __dict__, slot-offset attribute reads
+    __slots__ = (
+        'api_key', 'secret_key', 'base_url', 'session',
+        '_url_place_order', '_url_close_all', '_url_close_position', '_url_pos_tpsl_legacy',
+        '_url_tpsl_position', '_url_tpsl', '_url_query_order', '_url_leverage',
+        '_url_tickers', '_url_klines', '_url_pending_positions', '_url_positions', '_url_account',
+        '_api_key_b', '_secret_key_b', '_base_headers',
+        'test_mode', 'test_manager', 'use_disk_cache', 'token_manager', '_token_cfg', '_trading_sym',
+        '_default_retries', '_default_retry_delay', '_pending_cache', '_price_cache',
+    )
+    
+    def __init__(self, test_mode: bool = None, use_cache: bool = True):
         self.api_key = BITUNIX_CONFIG["api_key"]
         self.secret_key = BITUNIX_CONFIG["api_secret"]
         self.base_url = BITUNIX_CONFIG["base_url"]
+        # Endpoint URLs built once instead of per request
+        self._url_place_order = f"{self.base_url}/api/v1/futures/trade/place_order"
+        self._url_close_all = f"{self.base_url}/api/v1/futures/trade/close_all_position"
+        self._url_close_position = f"{self.base_url}/api/v1/futures/trade/close_position"
+        self._url_pos_tpsl_legacy = f"{self.base_url}/api/v1/futures/trade/place_position_tp_sl_order"
+        self._url_tpsl_position = f"{self.base_url}/api/v1/futures/tpsl/position/place_order"
+        self._url_tpsl = f"{self.base_url}/api/v1/futures/tpsl/place_order"
+        self._url_query_order = f"{self.base_url}/api/v1/futures/trade/query_order"
+        self._url_leverage = f"{self.base_url}/api/v1/futures/account/leverage"
+        self._url_tickers = f"{self.base_url}/api/v1/futures/market/tickers"
+        self._url_klines = f"{self.base_url}/api/v1/futures/market/klines"
+        self._url_pending_positions = f"{self.base_url}/api/v1/futures/position/get_pending_positions"
+        self._url_positions = f"{self.base_url}/api/v1/futures/position/get_positions"
+        self._url_account = f"{self.base_url}/api/v1/futures/account"
         self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_CONNECTIONS,
+            pool_maxsize=HTTP_POOL_MAXSIZE,
+            max_retries=Retry(
+                total=HTTP_MAX_RETRIES,
+                backoff_factor=HTTP_RETRY_BACKOFF,
+                status_forcelist=HTTP_RETRY_STATUSES,
+                # Retry-After on a 429 is unbounded - use our own short backoff instead
+                respect_retry_after_header=False,
+                # Hand the final 5xx response back to _handle_response instead of raising RetryError
+                raise_on_status=False,
+            )
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            'Connection': 'keep-alive',
+            'Content-Type': 'application/json'
+        })
+        # Signing keys encoded once instead of per request
+        self._api_key_b = self.api_key.encode('utf-8')
+        self._secret_key_b = self.secret_key.encode('utf-8')
+        # Static part of the signed-request headers, built once
+        self._base_headers = {'api-key': self.api_key}
         
         # Test mode configuration
         # Test mode setup
         self.test_mode = test_mode if test_mode is not None else TEST_MODE
         self.test_manager = TestTradeManager() if self.test_mode else None
+        # Reuse probed minimum quantities from disk (see MIN_QTY_CACHE_TTL)
+        self.use_disk_cache = use_cache
         self.token_manager = TokenConfigManager()
+        # Token configs don't change at runtime - resolve them once per supported token
+        self._token_cfg = {s: self.token_manager.get_token_config(s) for s in SUPPORTED_TOKENS}
+        self._trading_sym = {s: self.token_manager.get_trading_symbol(s) for s in SUPPORTED_TOKENS}
         
         # Default lightweight retry settings for flaky endpoints
         self._default_retries = 2
         self._default_retry_delay = 0.5
+        # (fetched_at, response, index) from the last successful get_pending_positions
+        self._pending_cache = (0.0, None, None)
+        # symbol -> (price, fetched_at), filled from every successful ticker response
+        self._price_cache: Dict[str, tuple] = {}
         
         print(f"Initialized BitunixClient (Test Mode: {self.test_mode})")
     
@@ -125,47 +312,54 @@ class BitunixClient:
     
     def get_token_info(self, symbol: str) -> Dict[str, Any]:
         """Get detailed information about a token"""
-        config = self.token_manager.get_token_config(symbol)
-        trading_symbol = self.token_manager.get_trading_symbol(symbol)
+        if self.test_mode:
+            return self._get_token_info_test(symbol)
+        return self._get_token_info_live(symbol)
+    
+    def _resolve_token(self, symbol: str):
+        """(config, trading_symbol) for a token, from the precomputed maps when supported"""
+        config = self._token_cfg.get(symbol)
+        if config is None:
+            config = self.token_manager.get_token_config(symbol)
+        trading_symbol = self._trading_sym.get(symbol) or self.token_manager.get_trading_symbol(symbol)
+        return config, trading_symbol
+    
+    def _get_token_info_test(self, symbol: str) -> Dict[str, Any]:
+        """Token info from local config and mock prices (no network)"""
+        config, trading_symbol = self._resolve_token(symbol)
+        return self._build_token_info(symbol, trading_symbol, config,
+                                      MOCK_PRICES.get(trading_symbol, 1.0),
+                                      config.get('min_qty', 0.01))
+    
+    def _get_token_info_live(self, symbol: str, current_price: Optional[float] = None) -> Dict[str, Any]:
+        """Token info with current price and real minimum quantity from the API"""
+        config, trading_symbol = self._resolve_token(symbol)
         
-        # Get current price (if not in test mode)
-        current_price = 0.0
-        if not self.test_mode:
+        if current_price is None:
+            current_price = 0.0
             try:
                 price_data = self.get_ticker_price(trading_symbol)
                 if price_data and price_data.get('code') == 0:
-                    # Handle the case where data is a list of tickers
-                    if isinstance(price_data['data'], list):
-                        for ticker in price_data['data']:
-                            if ticker.get('symbol') == trading_symbol:
-                                current_price = float(ticker.get('lastPrice', 0))
-                                break
-                    else:
-                        # Handle single ticker response
-                        current_price = float(price_data.get('data', {}).get('lastPrice', 0))
+                    current_price = extract_last_price(price_data, trading_symbol)
             except Exception:
                 pass
-        else:
-            # Mock prices for testing
-            mock_prices = {
-                'XRPUSDT': 0.75, 'ADAUSDT': 0.45, 'SUIUSDT': 1.85,
-                'UNIUSDT': 8.50, 'LINKUSDT': 15.20, 'SOLUSDT': 125.50
-            }
-            current_price = mock_prices.get(trading_symbol, 1.0)
         
-        # Get real minimum quantity from API if not in test mode
         real_min_qty = config.get('min_qty', 0.01)
-        if not self.test_mode:
-            try:
-                real_min_qty = self.get_real_minimum_quantity(trading_symbol)
-            except Exception as e:
-                print(f"Could not get real min quantity for {trading_symbol}: {e}")
+        try:
+            real_min_qty = self._get_min_quantity(trading_symbol)
+        except Exception as e:
+            logger.warning("Could not get real min quantity for %s: %s", trading_symbol, e)
         
+        return self._build_token_info(symbol, trading_symbol, config, current_price, real_min_qty)
+    
+    @staticmethod
+    def _build_token_info(symbol: str, trading_symbol: str, config: Dict[str, Any],
+                          current_price: float, min_quantity: float) -> Dict[str, Any]:
         return {
             'symbol': symbol,
             'trading_symbol': trading_symbol,
             'current_price': current_price,
-            'min_quantity': real_min_qty,
+            'min_quantity': min_quantity,
             'price_decimals': config.get('price_decimals', 4),
             'qty_decimals': config.get('qty_decimals', 3),
             'sentiment_weight': config.get('sentiment_weight', 1.0)
@@ -173,10 +367,24 @@ class BitunixClient:
     
     def get_all_tokens_info(self) -> Dict[str, Dict]:
         """Get information for all supported tokens"""
-        tokens_info = {}
-        for symbol in self.get_supported_tokens():
-            tokens_info[symbol] = self.get_token_info(symbol)
-        return tokens_info
+        return self.get_tokens_info(SUPPORTED_TOKENS)
+    
+    def get_tokens_info(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Get information for several tokens"""
+        if self.test_mode:
+            return {symbol: self.get_token_info(symbol) for symbol in symbols}
+        if not symbols:
+            return {}
+        # One batched ticker request for every price, then the per-token min-qty
+        # lookups run concurrently on the shared session
+        trading_symbols = [self._resolve_token(symbol)[1] for symbol in symbols]
+        prices = [None] * len(trading_symbols)
+        tickers = self.get_tickers(trading_symbols)
+        if tickers.get('code') == 0:
+            prices = [extract_last_price(tickers, sym) for sym in trading_symbols]
+        with ThreadPoolExecutor(max_workers=min(8, len(symbols))) as executor:
+            results = list(executor.map(self._get_token_info_live, symbols, prices))
+        return dict(zip(symbols, results))
     
     def calculate_position_size(self, symbol: str, sentiment_confidence: float = 0.5, 
                               max_risk_usd: float = None) -> Dict[str, float]:
@@ -189,15 +397,38 @@ class BitunixClient:
             max_risk_usd: Maximum risk in USD (overrides config)
         
         Returns:
-            Dict with quantity, size_usd, and risk info
+            Dict with quantity (float, plus quantity_str ready to send), size_usd, and risk info
         """
         token_info = self.get_token_info(symbol)
+        return self._size_position(symbol, token_info, sentiment_confidence, max_risk_usd)
+    
+    def calculate_position_sizes_batch(self, symbols: List[str], confidences: List[float],
+                                       max_risk_usd: float = None) -> Dict[str, Dict[str, float]]:
+        """
+        Calculate position sizes for several tokens, fetching all token info in one pass
+        
+        Args:
+            symbols: Token symbols (e.g., ['XRP', 'SOL'])
+            confidences: Confidence level 0-1 for each symbol
+            max_risk_usd: Maximum risk in USD (overrides config)
+        
+        Returns:
+            Dict mapping each symbol to the calculate_position_size result
+        """
+        tokens_info = self.get_tokens_info(symbols)
+        return {
+            symbol: self._size_position(symbol, tokens_info[symbol], confidence, max_risk_usd)
+            for symbol, confidence in zip(symbols, confidences)
+        }
+    
+    def _size_position(self, symbol: str, token_info: Dict[str, Any], sentiment_confidence: float,
+                       max_risk_usd: float = None) -> Dict[str, float]:
+        """Sizing math shared by calculate_position_size and calculate_position_sizes_batch"""
         current_price = token_info['current_price']
         min_quantity = token_info['min_quantity']
         
         if self.test_mode:
             # Use test manager for position sizing
-            max_risk = max_risk_usd or MAX_POSITION_SIZE_USD
             quantity = self.test_manager.calculate_position_size(
                 token_info['trading_symbol'], current_price, sentiment_confidence
             )
@@ -218,74 +449,118 @@ class BitunixClient:
         
         return {
             'quantity': quantity,
+            'quantity_str': str(quantity),
+            'trading_symbol': token_info['trading_symbol'],
             'size_usd': size_usd,
             'price': current_price,
             'min_quantity': min_quantity,
             'risk_percentage': (size_usd / 25.0) * 100  # Assuming $25 account
         }
     
+    def _sign(self, nonce: str, timestamp: str, query_string: str, body: bytes) -> str:
+        """
+        Dual SHA256 signature (same scheme as get_signature) fed from pre-encoded
+        key bytes, without building the concatenated input string
+        """
+        h = hashlib.sha256()
+        h.update((nonce + timestamp).encode('utf-8'))
+        h.update(self._api_key_b)
+        # Signed POSTs carry no query string and signed GETs no body - skip the empty parts
+        if query_string:
+            h.update(query_string.encode('utf-8'))
+        if body:
+            h.update(body)
+        # Stage 2 hashes the hex form of the stage-1 digest; hexlify yields bytes directly
+        return hashlib.sha256(binascii.hexlify(h.digest()) + self._secret_key_b).hexdigest()
+    
+    def _auth_headers(self, query_string: str = "", body: bytes = b"") -> Dict[str, str]:
+        """Signed request headers: cached static headers plus fresh nonce/timestamp/sign"""
+        nonce = get_nonce()
+        timestamp = get_timestamp()
+        headers = self._base_headers.copy()
+        headers['nonce'] = nonce
+        headers['timestamp'] = timestamp
+        headers['sign'] = self._sign(nonce, timestamp, query_string, body)
+        return headers
+    
     def _handle_response(self, response: requests.Response) -> Dict[str, Any]:
         """Handle API response and return parsed JSON"""
         try:
             response.raise_for_status()
-            result = response.json()
-            # Normalize non-dict payloads into a standard {code,data,msg} shape
-            if isinstance(result, list):
-                return {"code": 0, "data": result, "msg": "Success"}
+            data = response.content
+            if not data:
+                return {"code": 0, "data": [], "msg": "Success"}
+            # orjson parses the raw bytes directly (no str decode step)
+            result = orjson.loads(data)
+            # Normalize non-dict payloads (e.g. bare ticker lists) into a standard {code,data,msg} shape
             if not isinstance(result, dict):
                 return {"code": 0, "data": result, "msg": "Success"}
 
-            # Print API errors but return the response for caller to handle
+            # Log API errors but return the response for caller to handle
             if result.get('code') != 0:
                 error_msg = result.get('msg', 'Unknown error')
                 error_code = result.get('code', -1)
                 # Suppress "System error" (code 2) in test mode - these are expected
                 if not (self.test_mode and error_code == 2):
-                    print(f"API Error {error_code}: {error_msg}")
+                    logger.warning("API Error %s: %s", error_code, error_msg)
 
             return result
             
         except requests.exceptions.RequestException as e:
-            print(f"Request error: {e}")
-            if hasattr(e, 'response') and e.response:
-                print(f"Response text: {e.response.text}")
-            raise
-        except json.JSONDecodeError as e:
-            print(f"JSON decode error: {e}")
-            print(f"Response text: {response.text}")
+            logger.warning("Request error: %s", e)
+            # Only decode the (possibly large) body when debug output is wanted
+            if logger.isEnabledFor(logging.DEBUG) and getattr(e, 'response', None) is not None:
+                logger.debug("Response text: %s", e.response.text)
             raise
+        except orjson.JSONDecodeError as e:
+            logger.warning("JSON decode error: %s", e)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Response text: %s", response.text)
+            # Non-JSON body (e.g. a gateway HTML page) - report it like any other API error
+            snippet = response.content[:200].decode('utf-8', 'replace')
+            return {"code": -1, "msg": f"Invalid JSON response: {snippet}"}
 
-    def _post_json(self, path: str, body_dict: Dict[str, Any], retries: Optional[int] = None,
+    def _post_json(self, url: str, body_dict: Dict[str, Any], retries: Optional[int] = None,
                    retry_delay: Optional[float] = None) -> Dict[str, Any]:
         """
         Helper to POST JSON with signing and lightweight retry on transient errors.
-        Retries when API returns non-zero code, up to retries.
+        Retries when API returns non-zero code, up to retries, with exponential backoff.
         """
+        return self._post_body(url, canonical_json(body_dict), retries, retry_delay)
+
+    def _post_body(self, url: str, body: bytes, retries: Optional[int] = None,
+                   retry_delay: Optional[float] = None) -> Dict[str, Any]:
+        """Signed POST of an already-serialized canonical JSON body (see _post_json)"""
         if retries is None:
             retries = self._default_retries
         if retry_delay is None:
             retry_delay = self._default_retry_delay
 
-        url = f"{self.base_url}{path}"
-        body = json.dumps(body_dict, separators=(',', ':'), sort_keys=True)
-        headers = get_auth_headers(self.api_key, self.secret_key, "", body)
-
         last_res: Dict[str, Any] = {}
         for attempt in range(retries + 1):
-            response = self.session.post(url, data=body, headers=headers)
+            # Re-sign each attempt so retries carry a fresh nonce/timestamp
+            headers = self._auth_headers(body=body)
+            response = self.session.post(url, data=body, headers=headers, timeout=HTTP_TIMEOUT)
             res = self._handle_response(response)
             # Success
             if isinstance(res, dict) and res.get('code') == 0:
                 return res
             last_res = res
-            # Backoff before next try
+            # Exponential backoff before next try
             if attempt < retries:
-                try:
-                    time.sleep(retry_delay)
-                except Exception:
-                    pass
+                time.sleep(retry_delay * (1 << attempt))
         return last_res
     
+    def _submit_order(self, body: Union[Dict[str, Any], bytes]) -> Dict[str, Any]:
+        """
+        POST a body to place_order. Sent once: a rejected order is returned to the
+        caller rather than resubmitted.
+        """
+        if isinstance(body, dict):
+            body = canonical_json(body)
+        self._invalidate_pending()
+        return self._post_body(self._url_place_order, body, retries=0)
+    
     # ==================== WORKING ENDPOINTS (✅) ====================
     
     def place_market_order(self, symbol: str, side: str, quantity: str) -> Dict[str, Any]:
@@ -302,25 +577,13 @@ class BitunixClient:
         Returns:
             API response with order details including orderId
         """
+        self._invalidate_pending()
         if self.test_mode:
             # Use paper trading
             price = self.get_mock_price(symbol)
             return self.test_manager.simulate_trade(symbol, side, float(quantity), price)
         
-        url = f"{self.base_url}/api/v1/futures/trade/place_order"
-        body_dict = {
-            "symbol": symbol,
-            "side": side,
-            "orderType": "MARKET",
-            "qty": quantity,
-            "tradeSide": "OPEN"
-        }
-        
-        body = json.dumps(body_dict, separators=(',', ':'), sort_keys=True)
-        headers = get_auth_headers(self.api_key, self.secret_key, "", body)
-        
-        response = self.session.post(url, data=body, headers=headers)
-        return self._handle_response(response)
+        return self._submit_order(market_order_body(symbol, side, quantity))
     
     def place_multi_token_order(self, token_symbol: str, side: str, 
                                sentiment_confidence: float = 0.5) -> Dict[str, Any]:
@@ -335,13 +598,10 @@ class BitunixClient:
         Returns:
             API response with order details
         """
-        # Get token configuration
-        token_info = self.get_token_info(token_symbol)
-        trading_symbol = token_info['trading_symbol']
-        
-        # Calculate position size
+        # Calculate position size (also resolves the trading symbol, so token info is fetched once)
         position_info = self.calculate_position_size(token_symbol, sentiment_confidence)
-        quantity = str(position_info['quantity'])
+        trading_symbol = position_info['trading_symbol']
+        quantity = position_info['quantity_str']
         
         print(f"Placing {side} order for {token_symbol}:")
         print(f"  Trading Symbol: {trading_symbol}")
@@ -354,39 +614,57 @@ class BitunixClient:
     
     def get_mock_price(self, symbol: str) -> float:
         """Get mock price for test mode"""
-        mock_prices = {
-            'XRPUSDT': 0.75, 'ADAUSDT': 0.45, 'SUIUSDT': 1.85,
-            'UNIUSDT': 8.50, 'LINKUSDT': 15.20, 'SOLUSDT': 125.50
-        }
-        return mock_prices.get(symbol, 1.0)
+        return MOCK_PRICES.get(symbol, 1.0)
     
     def get_ticker_price(self, symbol: str) -> Dict[str, Any]:
         """Get current ticker price for a symbol"""
         try:
             # url = f"{self.base_url}/api/v1/futures/market/tickers?symbols=BTCUSDT,ETHUSDT"
             # params = {}
-            url = f"{self.base_url}/api/v1/futures/market/tickers"
+            url = self._url_tickers
             params = {"symbols": symbol}
             
-            response = self.session.get(url, params=params, timeout=10)
-            return self._handle_response(response)
+            response = self.session.get(url, params=params, timeout=HTTP_TIMEOUT)
+            return self._cache_prices(self._handle_response(response))
             
         except Exception as e:
-            print(f"Error getting ticker price for {symbol}: {e}")
+            logger.warning("Error getting ticker price for %s: %s", symbol, e)
             return {"code": -1, "msg": str(e)}
     
+    def get_tickers(self, symbols: List[str]) -> Dict[str, Any]:
+        """Get ticker prices for several symbols in a single request"""
+        return self.get_ticker_price(",".join(symbols))
+    
     def get_all_tickers(self) -> Dict[str, Any]:
         """Get all ticker prices"""
         try:
-            url = f"{self.base_url}/api/v1/futures/market/tickers"
+            url = self._url_tickers
             
-            response = self.session.get(url, timeout=10)
-            return self._handle_response(response)
+            response = self.session.get(url, timeout=HTTP_TIMEOUT)
+            return self._cache_prices(self._handle_response(response))
             
         except Exception as e:
-            print(f"Error getting all tickers: {e}")
+            logger.warning("Error getting all tickers: %s", e)
             return {"code": -1, "msg": str(e)}
     
+    def _cache_prices(self, tickers: Dict[str, Any]) -> Dict[str, Any]:
+        """Record every lastPrice in a tickers response in the price cache; returns it unchanged"""
+        if tickers.get('code') == 0:
+            data = tickers.get('data') or []
+            now = time.monotonic()
+            for ticker in data if isinstance(data, list) else [data]:
+                price = float(ticker.get('lastPrice') or 0)
+                if price > 0:
+                    self._price_cache[ticker.get('symbol')] = (price, now)
+        return tickers
+    
+    def _cached_price(self, symbol: str) -> Optional[float]:
+        """Price from a ticker response seen within PRICE_CACHE_TTL, else None"""
+        entry = self._price_cache.get(symbol)
+        if entry and time.monotonic() - entry[1] < PRICE_CACHE_TTL:
+            return entry[0]
+        return None
+    
     def place_limit_order(self, symbol: str, side: str, quantity: str, price: str,
                          trade_side: str = "OPEN") -> Dict[str, Any]:
         """
@@ -402,7 +680,6 @@ class BitunixClient:
         Returns:
             API response with order details
         """
-        url = f"{self.base_url}/api/v1/futures/trade/place_order"
         body_dict = {
             "symbol": symbol,
             "side": side,
@@ -412,11 +689,7 @@ class BitunixClient:
             "tradeSide": trade_side
         }
         
-        body = json.dumps(body_dict, separators=(',', ':'), sort_keys=True)
-        headers = get_auth_headers(self.api_key, self.secret_key, "", body)
-        
-        response = self.session.post(url, data=body, headers=headers)
-        return self._handle_response(response)
+        return self._submit_order(body_dict)
     
     def place_stop_loss(self, symbol: str, side: str, quantity: str, sl_price: str) -> Dict[str, Any]:
         """
@@ -431,7 +704,6 @@ class BitunixClient:
         Returns:
             API response with order details
         """
-        url = f"{self.base_url}/api/v1/futures/trade/place_order"
         body_dict = {
             "symbol": symbol,
             "side": side,
@@ -443,11 +715,7 @@ class BitunixClient:
             "reduceOnly": True
         }
         
-        body = json.dumps(body_dict, separators=(',', ':'), sort_keys=True)
-        headers = get_auth_headers(self.api_key, self.secret_key, "", body)
-        
-        response = self.session.post(url, data=body, headers=headers)
-        return self._handle_response(response)
+        return self._submit_order(body_dict)
     
     def place_take_profit(self, symbol: str, side: str, quantity: str, tp_price: str) -> Dict[str, Any]:
         """
@@ -462,7 +730,6 @@ class BitunixClient:
         Returns:
             API response with order details
         """
-        url = f"{self.base_url}/api/v1/futures/trade/place_order"
         body_dict = {
             "symbol": symbol,
             "side": side,
@@ -474,11 +741,7 @@ class BitunixClient:
             "reduceOnly": True
         }
         
-        body = json.dumps(body_dict, separators=(',', ':'), sort_keys=True)
-        headers = get_auth_headers(self.api_key, self.secret_key, "", body)
-        
-        response = self.session.post(url, data=body, headers=headers)
-        return self._handle_response(response)
+        return self._submit_order(body_dict)
 
     def place_position_tp_sl_order(
         self,
@@ -498,7 +761,6 @@ class BitunixClient:
 
         Any of TP or SL parts can be omitted by passing None.
         """
-        url = f"{self.base_url}/api/v1/futures/trade/place_position_tp_sl_order"
         body_dict: Dict[str, Any] = {"symbol": symbol}
         if tp_price is not None:
             body_dict.update({
@@ -517,7 +779,7 @@ class BitunixClient:
             if sl_qty is not None:
                 body_dict["slQty"] = str(sl_qty)
         # Use retry helper due to occasional transient API errors
-        return self._post_json("/api/v1/futures/trade/place_position_tp_sl_order", body_dict)
+        return self._post_json(self._url_pos_tpsl_legacy, body_dict)
 
     def close_all_positions(self, margin_coin: str = "USDT") -> Dict[str, Any]:
         """
@@ -538,14 +800,12 @@ class BitunixClient:
             >>> client.close_all_positions("USDT")
             {'code': 0, 'data': '', 'msg': 'Success'}
         """
-        url = f"{self.base_url}/api/v1/futures/trade/close_all_position"
-        body_dict = {"marginCoin": margin_coin}
-        
-        body = json.dumps(body_dict, separators=(',', ':'), sort_keys=True)
-        headers = get_auth_headers(self.api_key, self.secret_key, "", body)
-        
-        response = self.session.post(url, data=body, headers=headers)
-        return self._handle_response(response)
+        self._invalidate_pending()
+        if margin_coin == "USDT":
+            body = CLOSE_ALL_USDT_BODY
+        else:
+            body = canonical_json({"marginCoin": margin_coin})
+        return self._post_body(self._url_close_all, body, retries=0)
     
     def close_position_market(self, symbol: str, side: str, quantity: str) -> Dict[str, Any]:
         """
@@ -565,7 +825,6 @@ class BitunixClient:
             >>> # To close a BUY position, use SELL
             >>> client.close_position_market("XRPUSDT", "SELL", "2")
         """
-        url = f"{self.base_url}/api/v1/futures/trade/place_order"
         body_dict = {
             "symbol": symbol,
             "side": side,
@@ -574,11 +833,7 @@ class BitunixClient:
             "tradeSide": "CLOSE"
         }
         
-        body = json.dumps(body_dict, separators=(',', ':'), sort_keys=True)
-        headers = get_auth_headers(self.api_key, self.secret_key, "", body)
-        
-        response = self.session.post(url, data=body, headers=headers)
-        return self._handle_response(response)
+        return self._submit_order(body_dict)
     
     def close_position_by_id(self, position_id: str, symbol: str, margin_coin: str = "USDT") -> Dict[str, Any]:
         """
@@ -595,18 +850,14 @@ class BitunixClient:
         Returns:
             API response indicating success/failure
         """
-        url = f"{self.base_url}/api/v1/futures/trade/close_position"
         body_dict = {
             "positionId": position_id,
             "symbol": symbol,
             "marginCoin": margin_coin
         }
         
-        body = json.dumps(body_dict, separators=(',', ':'), sort_keys=True)
-        headers = get_auth_headers(self.api_key, self.secret_key, "", body)
-        
-        response = self.session.post(url, data=body, headers=headers)
-        return self._handle_response(response)
+        self._invalidate_pending()
+        return self._post_json(self._url_close_position, body_dict, retries=0)
 
     def close_position_via_place_order(
         self,
@@ -622,7 +873,6 @@ class BitunixClient:
         Docs note: When tradeSide is CLOSE, positionId is required. Side should match the
         original direction (close long: side=BUY; close short: side=SELL) and tradeSide=CLOSE.
         """
-        url = f"{self.base_url}/api/v1/futures/trade/place_order"
         body_dict = {
             "symbol": symbol,
             "qty": str(quantity),
@@ -632,8 +882,41 @@ class BitunixClient:
             "orderType": "MARKET",
             "reduceOnly": bool(reduce_only),
         }
+        self._invalidate_pending()
         # Use retry helper due to occasional transient API errors
-        return self._post_json("/api/v1/futures/trade/place_order", body_dict)
+        return self._post_json(self._url_place_order, body_dict)
+
+    @staticmethod
+    def _index_pending(pos_res: Dict[str, Any]) -> Dict[tuple, Dict[str, Any]]:
+        """Index a get_pending_positions response by (positionId, symbol)"""
+        return {(str(p.get("positionId")), p.get("symbol")): p for p in pos_res.get("data") or []}
+
+    @staticmethod
+    def _position_qty(position: Dict[str, Any]) -> Optional[str]:
+        """A position's qty as the string the API expects (None when missing)"""
+        qty = position.get("qty")
+        if qty is None or qty.__class__ is str:
+            return qty
+        return str(qty)
+
+    def _get_pending_index(self, ttl: float = PENDING_POSITIONS_TTL):
+        """
+        (response, index) for pending positions, reusing a successful fetch for ttl
+        seconds. index is None when the fetch failed.
+        """
+        fetched_at, pos_res, index = self._pending_cache
+        if pos_res is not None and time.monotonic() - fetched_at < ttl:
+            return pos_res, index
+        pos_res = self.get_pending_positions()
+        if pos_res.get("code") != 0:
+            return pos_res, None
+        index = self._index_pending(pos_res)
+        self._pending_cache = (time.monotonic(), pos_res, index)
+        return pos_res, index
+
+    def _invalidate_pending(self) -> None:
+        """Drop the cached pending positions after anything that opens or closes positions"""
+        self._pending_cache = (0.0, None, None)
 
     def close_position_full_by_id(self, symbol: str, position_id: str) -> Dict[str, Any]:
         """
@@ -644,11 +927,7 @@ class BitunixClient:
         pos_res = self.get_pending_positions()
         if pos_res.get("code") != 0:
             return pos_res
-        target = None
-        for p in pos_res.get("data", []) or []:
-            if str(p.get("positionId")) == str(position_id) and p.get("symbol") == symbol:
-                target = p
-                break
+        target = self._index_pending(pos_res).get((str(position_id), symbol))
         if not target:
             return {"code": -1, "msg": "Position not found for given positionId/symbol"}
         # Try both interpretations to maximize compatibility across modes
@@ -656,7 +935,7 @@ class BitunixClient:
         side_intuitive = "SELL" if target.get("side") == "BUY" else "BUY"
         # Variant B (per docs note): close long => BUY, close short => SELL
         side_docs = "BUY" if target.get("side") == "BUY" else "SELL"
-        qty = target.get("qty") if isinstance(target.get("qty"), str) else str(target.get("qty"))
+        qty = self._position_qty(target)
         # Attempt Variant A first
         res_a = self.close_position_via_place_order(
             symbol=symbol,
@@ -704,7 +983,7 @@ class BitunixClient:
             body_dict["slStopType"] = sl_stop_type
 
         # Use retry helper due to occasional transient API errors
-        return self._post_json("/api/v1/futures/tpsl/position/place_order", body_dict)
+        return self._post_json(self._url_tpsl_position, body_dict)
 
     def place_tpsl_order_with_qty(
         self,
@@ -730,7 +1009,6 @@ class BitunixClient:
         - At least one of tpQty or slQty is required
         - Default order type is MARKET; order price is optional for LIMIT
         """
-        url = f"{self.base_url}/api/v1/futures/tpsl/place_order"
         body_dict: Dict[str, Any] = {
             "symbol": symbol,
             "positionId": position_id,
@@ -753,7 +1031,7 @@ class BitunixClient:
             body_dict["slQty"] = str(sl_qty)
 
         # Use retry helper due to occasional transient API errors
-        return self._post_json("/api/v1/futures/tpsl/place_order", body_dict)
+        return self._post_json(self._url_tpsl, body_dict)
 
     # Convenience wrappers (explicit TP or SL only)
     def set_take_profit_by_id(
@@ -769,7 +1047,7 @@ class BitunixClient:
         return self.place_position_tpsl_by_id(
             symbol=symbol,
             position_id=position_id,
-            tp_price=str(tp_price),
+            tp_price=tp_price,
             tp_stop_type=tp_stop_type,
         )
 
@@ -786,41 +1064,65 @@ class BitunixClient:
         return self.place_position_tpsl_by_id(
             symbol=symbol,
             position_id=position_id,
-            sl_price=str(sl_price),
+            sl_price=sl_price,
             sl_stop_type=sl_stop_type,
         )
 
     # Convenience wrappers that ensure 100% of the current position size is used
-    def set_take_profit_full_by_id(
+    def set_tpsl_full_by_id(
         self,
         symbol: str,
         position_id: str,
-        tp_price: str,
+        tp_price: Optional[str] = None,
+        sl_price: Optional[str] = None,
         tp_stop_type: str = "LAST_PRICE",
+        sl_stop_type: str = "LAST_PRICE",
         tp_order_type: str = "MARKET",
+        sl_order_type: str = "MARKET",
     ) -> Dict[str, Any]:
         """
-        Set TP to close 100% of the position by fetching the current position qty.
+        Set TP and/or SL to close 100% of the position in a single tpsl order,
+        resolving the position qty once.
         """
-        # Fetch current pending positions and find this positionId
-        pos_res = self.get_pending_positions()
-        if pos_res.get("code") != 0:
+        if tp_price is None and sl_price is None:
+            return {"code": -1, "msg": "tp_price or sl_price is required"}
+        # Find this positionId in the (briefly cached) pending positions
+        pos_res, index = self._get_pending_index()
+        if index is None:
             return pos_res
-        qty: Optional[str] = None
-        for p in pos_res.get("data", []) or []:
-            if str(p.get("positionId")) == str(position_id) and p.get("symbol") == symbol:
-                qty = p.get("qty") if isinstance(p.get("qty"), str) else str(p.get("qty"))
-                break
+        p = index.get((str(position_id), symbol))
+        qty = self._position_qty(p) if p else None
         if not qty:
             return {"code": -1, "msg": "Position qty not found for positionId"}
 
         return self.place_tpsl_order_with_qty(
             symbol=symbol,
             position_id=position_id,
-            tp_price=str(tp_price),
-            tp_qty=qty,
+            tp_price=tp_price,
+            sl_price=sl_price,
+            tp_qty=qty if tp_price is not None else None,
+            sl_qty=qty if sl_price is not None else None,
             tp_stop_type=tp_stop_type,
+            sl_stop_type=sl_stop_type,
             tp_order_type=tp_order_type,
+            sl_order_type=sl_order_type,
+        )
+
+    def set_take_profit_full_by_id(
+        self,
+        symbol: str,
+        position_id: str,
+        tp_price: str,
+        tp_stop_type: str = "LAST_PRICE",
+        tp_order_type: str = "MARKET",
+    ) -> Dict[str, Any]:
+        """
+        Set TP to close 100% of the position by fetching the current position qty.
+        To set TP and SL together, use set_tpsl_full_by_id (one request).
+        """
+        return self.set_tpsl_full_by_id(
+            symbol, position_id, tp_price=tp_price,
+            tp_stop_type=tp_stop_type, tp_order_type=tp_order_type,
         )
 
     def set_stop_loss_full_by_id(
@@ -833,26 +1135,11 @@ class BitunixClient:
     ) -> Dict[str, Any]:
         """
         Set SL to close 100% of the position by fetching the current position qty.
+        To set TP and SL together, use set_tpsl_full_by_id (one request).
         """
-        # Fetch current pending positions and find this positionId
-        pos_res = self.get_pending_positions()
-        if pos_res.get("code") != 0:
-            return pos_res
-        qty: Optional[str] = None
-        for p in pos_res.get("data", []) or []:
-            if str(p.get("positionId")) == str(position_id) and p.get("symbol") == symbol:
-                qty = p.get("qty") if isinstance(p.get("qty"), str) else str(p.get("qty"))
-                break
-        if not qty:
-            return {"code": -1, "msg": "Position qty not found for positionId"}
-
-        return self.place_tpsl_order_with_qty(
-            symbol=symbol,
-            position_id=position_id,
-            sl_price=str(sl_price),
-            sl_qty=qty,
-            sl_stop_type=sl_stop_type,
-            sl_order_type=sl_order_type,
+        return self.set_tpsl_full_by_id(
+            symbol, position_id, sl_price=sl_price,
+            sl_stop_type=sl_stop_type, sl_order_type=sl_order_type,
         )
     
     def get_pending_positions(self) -> Dict[str, Any]:
@@ -886,10 +1173,10 @@ class BitunixClient:
                 'msg': 'Success (Paper Trading)'
             }
         
-        url = f"{self.base_url}/api/v1/futures/position/get_pending_positions"
-        headers = get_auth_headers(self.api_key, self.secret_key, "", "")
+        url = self._url_pending_positions
+        headers = self._auth_headers()
         
-        response = self.session.get(url, headers=headers)
+        response = self.session.get(url, headers=headers, timeout=HTTP_TIMEOUT)
         return self._handle_response(response)
     
     def close_all_positions(self, margin_coin: str = "USDT") -> Dict[str, Any]:
@@ -898,6 +1185,7 @@ class BitunixClient:
         
         ✅ VERIFIED WORKING - Most reliable close method
         """
+        self._invalidate_pending()
         if self.test_mode:
             # Close all paper trading positions
             closed_count = 0
@@ -915,14 +1203,11 @@ class BitunixClient:
                 'msg': 'Success (Paper Trading)'
             }
         
-        url = f"{self.base_url}/api/v1/futures/trade/close_all_position"
-        body_dict = {"marginCoin": margin_coin}
-        
-        body = json.dumps(body_dict, separators=(',', ':'), sort_keys=True)
-        headers = get_auth_headers(self.api_key, self.secret_key, "", body)
-        
-        response = self.session.post(url, data=body, headers=headers)
-        return self._handle_response(response)
+        if margin_coin == "USDT":
+            body = CLOSE_ALL_USDT_BODY
+        else:
+            body = canonical_json({"marginCoin": margin_coin})
+        return self._post_body(self._url_close_all, body, retries=0)
     
     def get_account_summary(self) -> Dict[str, Any]:
         """Get account summary with test mode support"""
@@ -962,13 +1247,13 @@ class BitunixClient:
         Returns:
             API response with account balance and margin info
         """
-        url = f"{self.base_url}/api/v1/futures/account"
+        url = self._url_account
         params = {"marginCoin": margin_coin}
         
         query_string = sort_params(params)
-        headers = get_auth_headers(self.api_key, self.secret_key, query_string)
+        headers = self._auth_headers(query_string)
         
-        response = self.session.get(url, params=params, headers=headers)
+        response = self.session.get(url, params=params, headers=headers, timeout=HTTP_TIMEOUT)
         return self._handle_response(response)
     
     def get_all_positions(self) -> Dict[str, Any]:
@@ -980,10 +1265,10 @@ class BitunixClient:
         Returns:
             API response with positions data
         """
-        url = f"{self.base_url}/api/v1/futures/position/get_positions"
-        headers = get_auth_headers(self.api_key, self.secret_key, "", "")
+        url = self._url_positions
+        headers = self._auth_headers()
         
-        response = self.session.get(url, headers=headers)
+        response = self.session.get(url, headers=headers, timeout=HTTP_TIMEOUT)
         return self._handle_response(response)
     
     def get_symbol_position(self, symbol: str, margin_coin: str = "USDT") -> Dict[str, Any]:
@@ -999,16 +1284,16 @@ class BitunixClient:
         Returns:
             API response with position data
         """
-        url = f"{self.base_url}/api/v1/futures/position/get_positions"
+        url = self._url_positions
         params = {
             "symbol": symbol,
             "marginCoin": margin_coin
         }
         
         query_string = sort_params(params)
-        headers = get_auth_headers(self.api_key, self.secret_key, query_string, "")
+        headers = self._auth_headers(query_string)
         
-        response = self.session.get(url, params=params, headers=headers)
+        response = self.session.get(url, params=params, headers=headers, timeout=HTTP_TIMEOUT)
         return self._handle_response(response)
     
     def set_leverage(self, symbol: str, margin_coin: str, leverage: int, 
@@ -1029,7 +1314,6 @@ class BitunixClient:
         Returns:
             API response
         """
-        url = f"{self.base_url}/api/v1/futures/account/leverage"
         body_dict = {
             "symbol": symbol,
             "marginCoin": margin_coin,
@@ -1037,11 +1321,7 @@ class BitunixClient:
             "marginMode": margin_mode
         }
         
-        body = json.dumps(body_dict, separators=(',', ':'), sort_keys=True)
-        headers = get_auth_headers(self.api_key, self.secret_key, "", body)
-        
-        response = self.session.post(url, data=body, headers=headers)
-        return self._handle_response(response)
+        return self._post_json(self._url_leverage, body_dict, retries=0)
     
     def query_order(self, order_id: str, symbol: str) -> Dict[str, Any]:
         """
@@ -1056,17 +1336,12 @@ class BitunixClient:
         Returns:
             API response with order details
         """
-        url = f"{self.base_url}/api/v1/futures/trade/query_order"
         body_dict = {
             "orderId": order_id,
             "symbol": symbol
         }
         
-        body = json.dumps(body_dict, separators=(',', ':'), sort_keys=True)
-        headers = get_auth_headers(self.api_key, self.secret_key, "", body)
-        
-        response = self.session.post(url, data=body, headers=headers)
-        return self._handle_response(response)
+        return self._post_json(self._url_query_order, body_dict, retries=0)
     
     # ==================== PUBLIC MARKET DATA ====================
     
@@ -1086,25 +1361,27 @@ class BitunixClient:
         """
         if self.test_mode:
             # Generate mock kline data for testing
-            import random
             current_time = int(time.time() * 1000)
-            interval_ms = {
-                "1m": 60000, "5m": 300000, "15m": 900000,
-                "30m": 1800000, "1h": 3600000, "4h": 14400000, "1d": 86400000
-            }.get(interval, 900000)
+            interval_ms = KLINE_INTERVAL_MS.get(interval, 900000)
             
             base_price = self.get_mock_price(symbol)
             klines = []
+            # Loop invariants hoisted; uniform(a, b) inlined as a + (b - a) * rand()
+            rand = random.random
+            volatility = base_price * 0.02
+            span = 2 * volatility
+            half_vol = volatility / 2
             
-            for i in range(limit):
-                candle_time = current_time - (interval_ms * (limit - i))
-                volatility = base_price * 0.02
-                
-                open_price = base_price + random.uniform(-volatility, volatility)
-                close_price = open_price + random.uniform(-volatility, volatility)
-                high_price = max(open_price, close_price) + random.uniform(0, volatility/2)
-                low_price = min(open_price, close_price) - random.uniform(0, volatility/2)
-                volume = random.uniform(100000, 1000000)
+            for candle_time in range(current_time - interval_ms * limit, current_time, interval_ms):
+                open_price = base_price - volatility + span * rand()
+                close_price = open_price - volatility + span * rand()
+                if open_price > close_price:
+                    high_price = open_price + half_vol * rand()
+                    low_price = close_price - half_vol * rand()
+                else:
+                    high_price = close_price + half_vol * rand()
+                    low_price = open_price - half_vol * rand()
+                volume = 100000 + 900000 * rand()
                 
                 klines.append({
                     "time": candle_time,
@@ -1119,21 +1396,44 @@ class BitunixClient:
             return {"code": 0, "data": klines, "msg": "success"}
         
         # Real API call (public endpoint)
-        url = f"{self.base_url}/api/v1/futures/market/klines"
+        url = self._url_klines
         params = {"symbol": symbol, "interval": interval, "limit": limit}
         
         try:
-            response = self.session.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=HTTP_TIMEOUT)
             return self._handle_response(response)
         except Exception as e:
             return {"code": -1, "msg": f"Error fetching klines: {str(e)}"}
 
+    def _get_min_quantity(self, symbol: str) -> float:
+        """Minimum quantity from the disk cache when fresh, otherwise probed (and cached)"""
+        if self.use_disk_cache:
+            qty = get_cached_min_qty(symbol)
+            if qty is not None:
+                return qty
+        qty = self._probe_minimum_quantity(symbol)
+        if qty is None:
+            logger.warning("Could not determine minimum quantity for %s, using default 1.0", symbol)
+            return 1.0
+        if self.use_disk_cache:
+            store_cached_min_qty(symbol, qty)
+        return qty
+
     def get_real_minimum_quantity(self, symbol: str) -> float:
         """
         Get the real minimum quantity required by the API for a symbol.
         
         This method tries different quantities to find the minimum accepted by the API.
         """
+        qty = self._probe_minimum_quantity(symbol)
+        if qty is None:
+            # If all failed, return a reasonable default
+            logger.warning("Could not determine minimum quantity for %s, using default 1.0", symbol)
+            return 1.0
+        return qty
+
+    def _probe_minimum_quantity(self, symbol: str) -> Optional[float]:
+        """Smallest quantity the API accepts for symbol, or None if every probe failed"""
         # Common minimum quantities to try, in order
         test_quantities = [0.001, 0.01, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 15.0, 20.0, 50.0, 100.0]
         
@@ -1164,18 +1464,17 @@ class BitunixClient:
                     continue
                     
             except Exception as e:
-                print(f"Error testing qty {qty} for {symbol}: {e}")
+                logger.warning("Error testing qty %s for %s: %s", qty, symbol, e)
                 continue
         
-        # If all failed, return a reasonable default
-        print(f"Could not determine minimum quantity for {symbol}, using default 1.0")
-        return 1.0
+        return None
 
     def get_current_price(self, symbol: str) -> float:
         """
         Get current price for a symbol using multiple fallback methods.
         
         This method tries multiple approaches to get the most reliable price:
+        0. A price from any ticker response in the last PRICE_CACHE_TTL seconds
         1. get_ticker_price API call
         2. get_all_tickers API call
         3. Returns 0.0 if all methods fail
@@ -1186,21 +1485,17 @@ class BitunixClient:
         Returns:
             Current price as float, or 0.0 if unable to fetch
         """
+        # Any ticker response within the last PRICE_CACHE_TTL already has it
+        price = self._cached_price(symbol)
+        if price is not None:
+            return price
+        
         # Method 1: Try get_ticker_price
         price_info = self.get_ticker_price(symbol)
-        if price_info.get('code') == 0 and price_info.get('data'):
-            # Handle the case where data is a list of tickers
-            if isinstance(price_info['data'], list):
-                for ticker in price_info['data']:
-                    if ticker.get('symbol') == symbol:
-                        price = float(ticker.get('lastPrice', 0))
-                        if price > 0:
-                            return price
-            else:
-                # Handle single ticker response
-                price = float(price_info.get('data', {}).get('lastPrice', 0))
-                if price > 0:
-                    return price
+        if price_info.get('code') == 0:
+            price = extract_last_price(price_info, symbol)
+            if price > 0:
+                return price
         
         # Method 2: Try get_all_tickers
         all_tickers = self.get_all_tickers()
@@ -1212,9 +1507,39 @@ class BitunixClient:
                         return price
         
         # Method 3: Return 0.0 if all methods fail
-        print(f"Warning: Unable to fetch current price for {symbol}")
+        logger.warning("Unable to fetch current price for %s", symbol)
         return 0.0
 
+    def get_current_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Get current prices for several symbols with a single batched ticker request.
+        
+        Symbols missing from the batch response fall back to get_current_price.
+        
+        Args:
+            symbols: Trading pairs (e.g., ["BTCUSDT", "XRPUSDT"])
+            
+        Returns:
+            Dict mapping each symbol to its price (0.0 if unable to fetch)
+        """
+        prices: Dict[str, float] = {}
+        for symbol in symbols:
+            price = self._cached_price(symbol)
+            if price is not None:
+                prices[symbol] = price
+        missing = [symbol for symbol in symbols if symbol not in prices]
+        if missing:
+            tickers = self.get_tickers(missing)
+            if tickers.get('code') == 0:
+                for symbol in missing:
+                    price = extract_last_price(tickers, symbol)
+                    if price > 0:
+                        prices[symbol] = price
+        for symbol in symbols:
+            if symbol not in prices:
+                prices[symbol] = self.get_current_price(symbol)
+        return prices
+
 
 # ==================== USAGE EXAMPLES ====================
 
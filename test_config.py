@@ -3,10 +3,12 @@ Test Configuration for Safe Trading
 Includes paper trading, small position sizing, and comprehensive logging.
 """
 
+import atexit
 import os
+import threading
 from typing import Dict, List
 from datetime import datetime
-import json
+import orjson
 
 # Test mode configuration - using global variables instead of dataclass to avoid validation issues
 TEST_MODE = False
@@ -51,22 +53,31 @@ MAX_POSITION_HOLD_HOURS = 24  # Close positions after 24 hours max
 LOG_LEVEL = "INFO"
 LOG_FILE = "logs/trading_bot.log"
 TRADE_LOG_FILE = "logs/trades.json"
+PAPER_DATA_FILE = "paper_trading_data.json"
 
 class TestTradeManager:
     """Manages test mode trading and paper trading simulation"""
     
+    __slots__ = (
+        'paper_balance', 'paper_positions', 'trade_history', 'daily_trade_count',
+        'last_reset_date', '_lock', '_trade_log_fp',
+        '_open_exposure', '_open_count', '_closed_count', '_closed_wins', '_realized_pnl',
+    )
+    
     def __init__(self):
         self.paper_balance = 25.0  # Starting balance
         self.paper_positions = {}  # symbol -> position data
         self.trade_history = []
         self.daily_trade_count = 0
         self.last_reset_date = datetime.now().date()
-        
-        # Create log directory
-        os.makedirs("logs", exist_ok=True)
+        # Guards balance/position updates - the client is shared across request threads
+        self._lock = threading.RLock()
+        # Trade log is opened on the first append, so importing this module touches no files
+        self._trade_log_fp = None
         
         # Load existing paper trading data
         self._load_paper_data()
+        self._rebuild_aggregates()
     
     def can_open_position(self, symbol: str, side: str, size_usd: float) -> bool:
         """Check if we can open a new position"""
@@ -87,9 +98,8 @@ class TestTradeManager:
         if size_usd < MIN_POSITION_SIZE_USD:
             return False
         
-        # Check total exposure
-        current_exposure = sum(pos['size_usd'] for pos in self.paper_positions.values())
-        if current_exposure + size_usd > MAX_TOTAL_EXPOSURE_USD:
+        # Check total exposure of open positions
+        if self._open_exposure + size_usd > MAX_TOTAL_EXPOSURE_USD:
             return False
         
         # Check available balance
@@ -120,170 +130,189 @@ class TestTradeManager:
                       trade_type: str = "market") -> Dict:
         """Simulate a trade in paper trading mode"""
         
-        size_usd = quantity * price
-        
-        if not self.can_open_position(symbol, side, size_usd):
+        with self._lock:
+            size_usd = quantity * price
+            
+            if not self.can_open_position(symbol, side, size_usd):
+                return {
+                    'success': False,
+                    'error': 'Position limits exceeded',
+                    'orderId': None
+                }
+            
+            # Generate fake order ID - suffixed when several trades land in the same second,
+            # so a new position never overwrites an existing one
+            base_id = f"PAPER_{int(datetime.now().timestamp())}"
+            order_id, n = base_id, 1
+            while order_id in self.paper_positions:
+                order_id = f"{base_id}_{n}"
+                n += 1
+            
+            # Calculate fees (0.1% typical)
+            fee_usd = size_usd * 0.001
+            
+            # Record position
+            position_data = {
+                'symbol': symbol,
+                'side': side,
+                'quantity': quantity,
+                'entry_price': price,
+                'size_usd': size_usd,
+                'fee_usd': fee_usd,
+                'timestamp': datetime.now().isoformat(),
+                'order_id': order_id,
+                'status': 'open'
+            }
+            
+            self.paper_positions[order_id] = position_data
+            self.paper_balance -= (size_usd + fee_usd)
+            self.daily_trade_count += 1
+            self._open_exposure += size_usd
+            self._open_count += 1
+            
+            # Log trade
+            self._log_trade(position_data)
+            
             return {
-                'success': False,
-                'error': 'Position limits exceeded',
-                'orderId': None
+                'success': True,
+                'orderId': order_id,
+                'quantity': quantity,
+                'price': price,
+                'size_usd': size_usd,
+                'fee_usd': fee_usd
             }
-        
-        # Generate fake order ID
-        order_id = f"PAPER_{int(datetime.now().timestamp())}"
-        
-        # Calculate fees (0.1% typical)
-        fee_usd = size_usd * 0.001
-        
-        # Record position
-        position_data = {
-            'symbol': symbol,
-            'side': side,
-            'quantity': quantity,
-            'entry_price': price,
-            'size_usd': size_usd,
-            'fee_usd': fee_usd,
-            'timestamp': datetime.now().isoformat(),
-            'order_id': order_id,
-            'status': 'open'
-        }
-        
-        self.paper_positions[order_id] = position_data
-        self.paper_balance -= (size_usd + fee_usd)
-        self.daily_trade_count += 1
-        
-        # Log trade
-        self._log_trade(position_data)
-        
-        return {
-            'success': True,
-            'orderId': order_id,
-            'quantity': quantity,
-            'price': price,
-            'size_usd': size_usd,
-            'fee_usd': fee_usd
-        }
     
     def close_paper_position(self, order_id: str, exit_price: float, reason: str = "manual") -> Dict:
         """Close a paper trading position"""
         
-        if order_id not in self.paper_positions:
-            return {'success': False, 'error': 'Position not found'}
-        
-        position = self.paper_positions[order_id]
-        
-        if position['status'] != 'open':
-            return {'success': False, 'error': 'Position already closed'}
-        
-        # Calculate P&L
-        entry_price = position['entry_price']
-        quantity = position['quantity']
-        
-        if position['side'] == 'BUY':
-            pnl_usd = (exit_price - entry_price) * quantity
-        else:
-            pnl_usd = (entry_price - exit_price) * quantity
-        
-        # Calculate fees
-        exit_size_usd = quantity * exit_price
-        exit_fee_usd = exit_size_usd * 0.001
-        
-        # Net P&L after fees
-        net_pnl = pnl_usd - position['fee_usd'] - exit_fee_usd
-        
-        # Update balance
-        self.paper_balance += exit_size_usd - exit_fee_usd
-        
-        # Update position
-        position.update({
-            'status': 'closed',
-            'exit_price': exit_price,
-            'exit_timestamp': datetime.now().isoformat(),
-            'pnl_usd': net_pnl,
-            'exit_fee_usd': exit_fee_usd,
-            'close_reason': reason
-        })
-        
-        # Log trade closure
-        self._log_trade_close(position)
-        
-        return {
-            'success': True,
-            'pnl_usd': net_pnl,
-            'exit_price': exit_price,
-            'position': position
-        }
+        with self._lock:
+            if order_id not in self.paper_positions:
+                return {'success': False, 'error': 'Position not found'}
+            
+            position = self.paper_positions[order_id]
+            
+            if position['status'] != 'open':
+                return {'success': False, 'error': 'Position already closed'}
+            
+            # Calculate P&L
+            entry_price = position['entry_price']
+            quantity = position['quantity']
+            
+            if position['side'] == 'BUY':
+                pnl_usd = (exit_price - entry_price) * quantity
+            else:
+                pnl_usd = (entry_price - exit_price) * quantity
+            
+            # Calculate fees
+            exit_size_usd = quantity * exit_price
+            exit_fee_usd = exit_size_usd * 0.001
+            
+            # Net P&L after fees
+            net_pnl = pnl_usd - position['fee_usd'] - exit_fee_usd
+            
+            # Update balance and running aggregates
+            self.paper_balance += exit_size_usd - exit_fee_usd
+            self._open_count -= 1
+            # Reset on the last close so float drift can't accumulate across positions
+            self._open_exposure = self._open_exposure - position['size_usd'] if self._open_count else 0.0
+            self._closed_count += 1
+            self._closed_wins += net_pnl > 0
+            self._realized_pnl += net_pnl
+            
+            # Update position
+            position.update({
+                'status': 'closed',
+                'exit_price': exit_price,
+                'exit_timestamp': datetime.now().isoformat(),
+                'pnl_usd': net_pnl,
+                'exit_fee_usd': exit_fee_usd,
+                'close_reason': reason
+            })
+            
+            # Log trade closure
+            self._log_trade_close(position)
+            
+            return {
+                'success': True,
+                'pnl_usd': net_pnl,
+                'exit_price': exit_price,
+                'position': position
+            }
     
     def get_paper_balance(self) -> Dict:
         """Get current paper trading balance and statistics"""
         
-        # Calculate unrealized P&L (would need current prices)
-        open_positions = [p for p in self.paper_positions.values() if p['status'] == 'open']
-        total_exposure = sum(p['size_usd'] for p in open_positions)
-        
-        # Calculate total P&L from closed positions
-        closed_positions = [p for p in self.paper_positions.values() if p['status'] == 'closed']
-        total_realized_pnl = sum(p.get('pnl_usd', 0) for p in closed_positions)
-        
+        # Unrealized P&L would need current prices; exposure and realized P&L are running totals
         return {
             'balance': self.paper_balance,
-            'total_exposure': total_exposure,
+            'total_exposure': self._open_exposure,
             'available_balance': self.paper_balance,
-            'open_positions': len(open_positions),
+            'open_positions': self._open_count,
             'total_trades': len(self.paper_positions),
-            'realized_pnl': total_realized_pnl,
+            'realized_pnl': self._realized_pnl,
             'win_rate': self._calculate_win_rate(),
             'daily_trades': self.daily_trade_count
         }
     
     def _calculate_win_rate(self) -> float:
         """Calculate win rate from closed positions"""
-        closed_positions = [p for p in self.paper_positions.values() if p['status'] == 'closed']
-        
-        if not closed_positions:
+        if not self._closed_count:
             return 0.0
         
-        winning_trades = len([p for p in closed_positions if p.get('pnl_usd', 0) > 0])
-        return winning_trades / len(closed_positions) * 100
+        return self._closed_wins / self._closed_count * 100
+    
+    def _rebuild_aggregates(self):
+        """Recompute the running open/closed totals from paper_positions (after a load)"""
+        self._open_exposure = 0.0
+        self._open_count = 0
+        self._closed_count = 0
+        self._closed_wins = 0
+        self._realized_pnl = 0.0
+        for p in self.paper_positions.values():
+            if p['status'] == 'open':
+                self._open_exposure += p['size_usd']
+                self._open_count += 1
+            elif p['status'] == 'closed':
+                pnl = p.get('pnl_usd', 0)
+                self._closed_count += 1
+                self._closed_wins += pnl > 0
+                self._realized_pnl += pnl
     
     def _log_trade(self, trade_data: Dict):
         """Log trade to file"""
-        try:
-            log_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'action': 'open_position',
-                'data': trade_data
-            }
-            
-            # Append to trade log
-            with open(TRADE_LOG_FILE, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
-                
-        except Exception as e:
-            print(f"Error logging trade: {e}")
+        self._append_trade_log('open_position', trade_data, "Error logging trade")
     
     def _log_trade_close(self, trade_data: Dict):
         """Log trade closure to file"""
+        self._append_trade_log('close_position', trade_data, "Error logging trade close")
+    
+    def _append_trade_log(self, action: str, trade_data: Dict, error_prefix: str):
+        """Append one JSON line to the trade log (flushed so it survives a crash)"""
         try:
             log_entry = {
                 'timestamp': datetime.now().isoformat(),
-                'action': 'close_position',
+                'action': action,
                 'data': trade_data
             }
             
-            # Append to trade log
-            with open(TRADE_LOG_FILE, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
+            if self._trade_log_fp is None:
+                # Create log directory and keep the trade log open for later appends
+                os.makedirs(os.path.dirname(TRADE_LOG_FILE), exist_ok=True)
+                self._trade_log_fp = open(TRADE_LOG_FILE, 'ab')
+                atexit.register(self._trade_log_fp.close)
+            
+            self._trade_log_fp.write(orjson.dumps(log_entry) + b'\n')
+            self._trade_log_fp.flush()
                 
         except Exception as e:
-            print(f"Error logging trade close: {e}")
+            print(f"{error_prefix}: {e}")
     
     def _load_paper_data(self):
         """Load existing paper trading data"""
         try:
-            if os.path.exists('paper_trading_data.json'):
-                with open('paper_trading_data.json', 'r') as f:
-                    data = json.load(f)
+            if os.path.exists(PAPER_DATA_FILE):
+                with open(PAPER_DATA_FILE, 'rb') as f:
+                    data = orjson.loads(f.read())
                     self.paper_balance = data.get('balance', 25.0)
                     self.paper_positions = data.get('positions', {})
                     self.daily_trade_count = data.get('daily_trade_count', 0)
@@ -301,8 +330,11 @@ class TestTradeManager:
                 'last_update': datetime.now().isoformat()
             }
             
-            with open('paper_trading_data.json', 'w') as f:
-                json.dump(data, f, indent=2)
+            # Write a temp file and swap it in so a crash never leaves a truncated file
+            tmp_path = PAPER_DATA_FILE + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(data))
+            os.replace(tmp_path, PAPER_DATA_FILE)
                 
         except Exception as e:
             print(f"Error saving paper data: {e}")
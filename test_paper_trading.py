@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Paper trading bookkeeping tests
+
+Run with: python -m unittest test_paper_trading
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import test_config
+from test_config import TestTradeManager
+
+
+class PaperTradingTest(unittest.TestCase):
+    def setUp(self):
+        # Keep the paper data file and trade log out of the working tree
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        self.manager = TestTradeManager()
+
+    def tearDown(self):
+        if self.manager._trade_log_fp is not None:
+            self.manager._trade_log_fp.close()
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_same_second_trades_keep_totals_consistent(self):
+        fixed_now = test_config.datetime(2026, 1, 1, 12, 0, 0)
+        with mock.patch.object(test_config, 'datetime', wraps=test_config.datetime) as dt:
+            dt.now.return_value = fixed_now
+            first = self.manager.simulate_trade('XRPUSDT', 'BUY', 2.0, 0.75)
+            second = self.manager.simulate_trade('XRPUSDT', 'BUY', 2.0, 0.75)
+
+        self.assertTrue(first['success'])
+        self.assertTrue(second['success'])
+        self.assertNotEqual(first['orderId'], second['orderId'])
+
+        self.assertTrue(self.manager.close_paper_position(first['orderId'], 0.80)['success'])
+
+        balance = self.manager.get_paper_balance()
+        self.assertEqual(balance['open_positions'], 1)
+        self.assertAlmostEqual(balance['total_exposure'], 1.5)
+        self.assertEqual(balance['total_trades'], 2)
+
+        self.assertTrue(self.manager.close_paper_position(second['orderId'], 0.80)['success'])
+
+        balance = self.manager.get_paper_balance()
+        self.assertEqual(balance['open_positions'], 0)
+        self.assertEqual(balance['total_exposure'], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
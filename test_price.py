@@ -3,42 +3,62 @@
 Test script for price fetching methods
 """
 
+import argparse
+
 from bitunix_model import BitunixClient
 
-def test_price_fetching():
+def print_prices(tickers, symbols):
+    """Print lastPrice for each wanted symbol in a tickers response; returns the symbols found"""
+    data = tickers.get('data') or []
+    # Index the response once, then look each symbol up directly
+    index = {t.get('symbol'): t for t in (data if isinstance(data, list) else [data])}
+    found = [symbol for symbol in symbols if symbol in index]
+    # Collect the per-symbol lines and write them in one print call
+    lines = [f"Price for {symbol}: {float(index[symbol].get('lastPrice', 0))}" for symbol in found]
+    if lines:
+        print(*lines, sep="\n")
+    return found
+
+def test_price_fetching(debug=False):
     print("Testing price fetching methods...")
 
     client = BitunixClient()
 
     symbols = ['BTCUSDT']
 
-    # for symbol in symbols:
-    #     print(f"\n=== Testing {symbol} ===")
-
-    # Method 1: get_ticker_price
+    # Method 1: get_ticker_price - one request for just the wanted symbols
     print("Method 1: get_ticker_price")
-    price_info = client.get_ticker_price(symbols)
-    print(f"Response: {price_info}")
-    if price_info.get('code') == 0 and price_info.get('data'):
-        # Handle the case where data is a list of tickers
-        if isinstance(price_info['data'], list):
-            for ticker in price_info['data']:
-                symbol_name = ticker.get('symbol')
-                price = float(ticker.get('lastPrice', 0))
-                print(f"Price for {symbol_name}: {price}")
-        else:
-            # Handle single ticker response
-            price = float(price_info['data'].get('lastPrice', 0))
-            print(f"Price: {price}")
+    price_info = client.get_tickers(symbols)
+    print(f"Response code: {price_info.get('code')}")
+    found = []
+    if price_info.get('code') == 0:
+        found = print_prices(price_info, symbols)
     else:
-        print("Failed")
+        print(price_info)
 
-    # Method 2: get_all_tickers
-    print("Method 2: get_all_tickers")
-    all_tickers = client.get_all_tickers()
-    print(all_tickers)
-    print(f"Response code: {all_tickers.get('code')}")
+    # Method 2: get_all_tickers - the full snapshot is only worth fetching
+    # when Method 1 missed a symbol, or when explicitly asked for with --debug
+    missing = [symbol for symbol in symbols if symbol not in found]
+    if missing or debug:
+        print("Method 2: get_all_tickers" + ("" if missing else " (debug)"))
+        all_tickers = client.get_all_tickers()
+        print(f"Response code: {all_tickers.get('code')}")
+        if all_tickers.get('code') == 0:
+            print(f"Tickers returned: {len(all_tickers.get('data') or [])}")
+            found = print_prices(all_tickers, missing or symbols)
+            for symbol in missing:
+                if symbol not in found:
+                    print(f"Failed for {symbol}")
+        else:
+            print(all_tickers)
     print("\n=== Done ===")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Test Bitunix price fetching")
+    parser.add_argument("--debug", action="store_true",
+                        help="also fetch the full get_all_tickers snapshot")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    test_price_fetching()
\ No newline at end of file
+    args = parse_args()
+    test_price_fetching(debug=args.debug)
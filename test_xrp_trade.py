@@ -4,85 +4,144 @@ XRP Minimum Quantity Trade Test Script
 
 This script demonstrates getting the real minimum quantity for XRP from the API
 and shows trade calculations before allowing the user to place a test trade.
-"""
 
-from bitunix_model import BitunixClient
+Options:
+    --yes       place the trade without the confirmation prompt
+    --dry-run   show trade details only, never place the trade
+    --no-cache  re-probe the minimum quantity and leverage instead of using the disk caches
+"""
 
-def get_xrp_trade_details():
+import argparse
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from bitunix_model import BitunixClient, load_disk_cache_entry, store_disk_cache_entry
+
+LEVERAGE_CACHE_FILE = os.path.join(".cache", "leverage.json")
+LEVERAGE_CACHE_TTL = 3600  # leverage rarely changes - re-read positions hourly
+
+RULE = "=" * 60
+TRADE_DETAILS_TEMPLATE = f"""{RULE}
+🪙 XRP MINIMUM QUANTITY TRADE DETAILS
+{RULE}
+Symbol: {{symbol}}
+Trading Pair: {{trading_symbol}}
+Current Price: ${{current_price:.4f}}
+Leverage: {{leverage}}x
+
+📊 TRADE CALCULATIONS:
+Min Quantity: {{min_quantity}} XRP
+Position Size: {{quantity}} XRP
+Position Value: ${{position_value:.4f}}
+Margin Required: ${{margin_required:.4f}}
+Risk: {{risk_percentage:.2f}}% of account
+
+🎯 POTENTIAL OUTCOMES:
+2% Gain: +${{potential_pnl_2pct:.4f}}
+Liquidation Price: ${{liquidation_price:.4f}}
+{RULE}"""
+
+
+class TradeDetails(NamedTuple):
+    """Calculated details for a minimum quantity trade"""
+    symbol: str
+    trading_symbol: str
+    min_quantity: float
+    current_price: float
+    leverage: int
+    quantity: float
+    position_value: float
+    margin_required: float
+    potential_pnl_2pct: float
+    liquidation_price: float
+    risk_percentage: float
+
+def get_cached_leverage(trading_symbol):
+    """Leverage cached on disk within LEVERAGE_CACHE_TTL, else None"""
+    entry = load_disk_cache_entry(LEVERAGE_CACHE_FILE, trading_symbol, LEVERAGE_CACHE_TTL)
+    leverage = entry and entry.get('leverage')
+    return leverage if isinstance(leverage, int) and leverage > 0 else None
+
+def store_cached_leverage(trading_symbol, leverage):
+    """Record the leverage read from a position in the on-disk cache"""
+    store_disk_cache_entry(LEVERAGE_CACHE_FILE, trading_symbol, {'leverage': leverage})
+
+def get_xrp_trade_details(client):
     """Get all trade details for XRP minimum quantity trade"""
-    client = BitunixClient()
 
-    # Get token info (this will fetch real min quantity from API)
-    token_info = client.get_token_info('XRP')
+    # A leverage cached within the last hour saves the positions request entirely
+    trading_symbol = client.token_manager.get_trading_symbol('XRP')
+    cached_leverage = get_cached_leverage(trading_symbol) if client.use_disk_cache else None
+
+    # Token info (real min quantity from API) and open positions are independent - fetch both at once
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        token_future = executor.submit(client.get_token_info, 'XRP')
+        positions_future = None if cached_leverage is not None else executor.submit(client.get_pending_positions)
+
+    token_info = token_future.result()
     trading_symbol = token_info['trading_symbol']
     min_quantity = token_info['min_quantity']
     current_price = token_info['current_price']
 
-    # Get leverage dynamically (try to get from existing positions, fallback to 5x)
-    leverage = 5  # Default based on existing positions
-    try:
-        positions = client.get_pending_positions()
-        if positions.get('code') == 0:
-            data = positions.get('data', [])
-            if data:
-                # Use leverage from first position
-                leverage = int(data[0].get('leverage', 5))
-    except:
-        pass
-
-    # Calculate trade details
+    # Get leverage dynamically (cache, then existing positions, fallback to 5x)
+    leverage = 5 if cached_leverage is None else cached_leverage  # Default based on existing positions
+    if positions_future is not None:
+        try:
+            positions = positions_future.result()
+            if positions.get('code') == 0:
+                data = positions.get('data', [])
+                match = next((p for p in data if p.get('symbol') == trading_symbol), None)
+                if match:
+                    # Only a position on this symbol says what its leverage is - safe to cache
+                    leverage = int(match.get('leverage', 5))
+                    if client.use_disk_cache:
+                        store_cached_leverage(trading_symbol, leverage)
+                elif data:
+                    # Otherwise guess from the first position, without caching the guess
+                    leverage = int(data[0].get('leverage', 5))
+        except:
+            pass
+
+    return compute_trade_details('XRP', trading_symbol, min_quantity, current_price, leverage)
+
+def compute_trade_details(symbol, trading_symbol, min_quantity, current_price, leverage):
+    """Trade calculations for a minimum quantity trade (no I/O - reusable per symbol)"""
     quantity = min_quantity
     position_value = quantity * current_price
     margin_required = position_value / leverage
     potential_pnl = position_value * 0.02  # 2% potential gain
     liquidation_price = current_price * (1 - (1/leverage) + 0.005)  # Simplified calc
 
-    return {
-        'symbol': 'XRP',
-        'trading_symbol': trading_symbol,
-        'min_quantity': min_quantity,
-        'current_price': current_price,
-        'leverage': leverage,
-        'quantity': quantity,
-        'position_value': position_value,
-        'margin_required': margin_required,
-        'potential_pnl_2pct': potential_pnl,
-        'liquidation_price': liquidation_price,
-        'risk_percentage': (margin_required / 25.0) * 100  # Assuming $25 account
-    }
+    return TradeDetails(
+        symbol=symbol,
+        trading_symbol=trading_symbol,
+        min_quantity=min_quantity,
+        current_price=current_price,
+        leverage=leverage,
+        quantity=quantity,
+        position_value=position_value,
+        margin_required=margin_required,
+        potential_pnl_2pct=potential_pnl,
+        liquidation_price=liquidation_price,
+        risk_percentage=(margin_required / 25.0) * 100  # Assuming $25 account
+    )
 
 def display_trade_details(details):
     """Display trade details in a formatted way"""
-    print("=" * 60)
-    print("🪙 XRP MINIMUM QUANTITY TRADE DETAILS")
-    print("=" * 60)
-    print(f"Symbol: {details['symbol']}")
-    print(f"Trading Pair: {details['trading_symbol']}")
-    print(f"Current Price: ${details['current_price']:.4f}")
-    print(f"Leverage: {details['leverage']}x")
-    print()
-    print("📊 TRADE CALCULATIONS:")
-    print(f"Min Quantity: {details['min_quantity']} XRP")
-    print(f"Position Size: {details['quantity']} XRP")
-    print(f"Position Value: ${details['position_value']:.4f}")
-    print(f"Margin Required: ${details['margin_required']:.4f}")
-    print(f"Risk: {details['risk_percentage']:.2f}% of account")
-    print()
-    print("🎯 POTENTIAL OUTCOMES:")
-    print(f"2% Gain: +${details['potential_pnl_2pct']:.4f}")
-    print(f"Liquidation Price: ${details['liquidation_price']:.4f}")
-    print("=" * 60)
-
-def place_test_trade(details):
+    # One template render and a single print call
+    print(TRADE_DETAILS_TEMPLATE.format_map(details._asdict()))
+
+def place_test_trade(client, details):
     """Place the actual test trade"""
-    client = BitunixClient()
 
-    print(f"\n🔄 Placing test trade for {details['quantity']} XRP at ${details['current_price']:.4f}...")
+    print(f"\n🔄 Placing test trade for {details.quantity} XRP at ${details.current_price:.4f}...")
 
     result = client.place_market_order(
-        details['trading_symbol'],
+        details.trading_symbol,
         'BUY',
-        str(details['quantity'])
+        str(details.quantity)
     )
 
     if result.get('code') == 0:
@@ -95,35 +154,54 @@ def place_test_trade(details):
         print(f"❌ TRADE FAILED: {error_msg}")
         return False
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="XRP minimum quantity trade test")
+    parser.add_argument('--yes', action='store_true', help="place the trade without prompting")
+    parser.add_argument('--dry-run', action='store_true', help="show trade details only")
+    parser.add_argument('--no-cache', action='store_true', help="re-probe the minimum quantity and leverage")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     print("🚀 XRP Minimum Quantity Trade Test")
     print("This script will show trade details and allow placing a test trade.\n")
 
     try:
-        # Get trade details
-        details = get_xrp_trade_details()
-
-        # Display details
-        display_trade_details(details)
-
-        # Ask user if they want to proceed
-        while True:
-            response = input("\n❓ Place this test trade? (y/n): ").lower().strip()
-            if response in ['y', 'yes']:
-                success = place_test_trade(details)
-                if success:
-                    print("\n📈 Trade placed successfully! Check your positions.")
-                break
-            elif response in ['n', 'no']:
-                print("Trade cancelled.")
-                break
-            else:
-                print("Please enter 'y' or 'n'")
+        # One client for the whole run, so the order reuses the pooled keep-alive connection
+        client = BitunixClient(use_cache=not args.no_cache)
 
+        # Get trade details
+        details = get_xrp_trade_details(client)
     except Exception as e:
         print(f"❌ Error: {e}")
-        import traceback
         traceback.print_exc()
+        return
+
+    # Display details
+    display_trade_details(details)
+
+    if args.dry_run:
+        print("Dry run - trade not placed.")
+        return
+
+    if args.yes:
+        if place_test_trade(client, details):
+            print("\n📈 Trade placed successfully! Check your positions.")
+        return
+
+    # Ask user if they want to proceed
+    while True:
+        response = input("\n❓ Place this test trade? (y/n): ").lower().strip()
+        if response in ['y', 'yes']:
+            success = place_test_trade(client, details)
+            if success:
+                print("\n📈 Trade placed successfully! Check your positions.")
+            break
+        elif response in ['n', 'no']:
+            print("Trade cancelled.")
+            break
+        else:
+            print("Please enter 'y' or 'n'")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file